@@ -2,7 +2,6 @@
 import anthropic
 import argparse
 import os
-import re
 import sys
 from datetime import datetime
 
@@ -18,7 +17,7 @@ def parse_arguments():
 
 def count_words(text):
     """Count the number of words in a text"""
-    return len(re.sub(r'(\r\n|\r|\n)', ' ', text).split())
+    return len(text.split())
 
 
 def retrieve_batch_result(client, message_id, debug=False):
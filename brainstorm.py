@@ -8,6 +8,7 @@ import argparse
 import re
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 parser = argparse.ArgumentParser(description='Generate concept and character files for writing development.')
@@ -30,7 +31,20 @@ parser.add_argument('--allow_new_characters', action='store_true', help='Allow c
 args = parser.parse_args()
 
 def count_words(text):
-    return len(re.sub(r'(\r\n|\r|\n)', ' ', text).split())
+    return len(text.split())
+
+# patterns used by remove_markdown_format, compiled once
+MD_HEADER_RE = re.compile(r'^#{1,6}\s+(.*)$', re.MULTILINE)
+# curly double and single quotes to plain ones, a single str.translate pass
+QUOTE_TRANSLATION = str.maketrans({
+    '\u201c': '"', '\u201d': '"', '\u201e': '"',
+    '\u2018': "'", '\u2019': "'", '\u201a': "'",
+})
+MD_BOLD_RE = re.compile(r'\*\*(.*?)\*\*')
+MD_ITALIC_RE = re.compile(r'\*(.*?)\*')
+MD_CODE_RE = re.compile(r'`(.*?)`')
+# runs of spaces, and spaces around a line break, in one pass
+SPACES_RE = re.compile(r' *\n *| +')
 
 def remove_markdown_format(text):
     """
@@ -40,24 +54,42 @@ def remove_markdown_format(text):
     - Remove any other Markdown formatting (bold, italic, code)
     """
     # Replace Markdown headers with plain text format
-    text = re.sub(r'^#{1,6}\s+(.*?)$', r'\1', text, flags=re.MULTILINE)
+    text = MD_HEADER_RE.sub(r'\1', text)
     
     # Replace special quotes with regular quotes
-    text = re.sub(r'["""]', '"', text)
-    text = re.sub(r"[''']", "'", text)
+    text = text.translate(QUOTE_TRANSLATION)
     
     # Remove Markdown formatting
-    text = re.sub(r'\*\*(.*?)\*\*', r'\1', text)  # Bold
-    text = re.sub(r'\*(.*?)\*', r'\1', text)      # Italic
-    text = re.sub(r'`(.*?)`', r'\1', text)        # Code
+    text = MD_BOLD_RE.sub(r'\1', text)    # Bold
+    text = MD_ITALIC_RE.sub(r'\1', text)  # Italic
+    text = MD_CODE_RE.sub(r'\1', text)    # Code
     
     # Clean up any extra spaces but preserve line breaks
-    text = re.sub(r' +', ' ', text)
-    text = re.sub(r' +\n', '\n', text)
-    text = re.sub(r'\n +', '\n', text)
+    text = SPACES_RE.sub(lambda m: '\n' if '\n' in m.group() else ' ', text)
     
     return text
 
+# a line break that none of the patterns above can match across, so the text on either side can
+# be cleaned separately: the line before isn't a bare "#" header marker and ends in something other
+# than whitespace, "*" or "`" (removing those can leave a space), and the (complete) line after
+# doesn't start with a space, "*" or "`", even once a "#" header marker is stripped from it
+STREAM_BREAK_BEFORE_RE = re.compile(r'(?!#{1,6}$).*[^\s*`]$')
+STREAM_BREAK_AFTER_RE = re.compile(r'(?![ *`]|#{1,6}(\s*$|\s+[*`]))')
+
+def clean_streamed_lines(pending_text, cleaned_parts):
+    """
+    Clean the streamed text up to the last safe line break with remove_markdown_format,
+    appending it to cleaned_parts, and return the rest to keep buffering. Cleaning the pieces
+    gives the same result as cleaning the whole response at the end.
+    """
+    lines = pending_text.split("\n")
+    # the last item is a partial line still streaming in, so the line after a break must come before it
+    for i in range(len(lines) - 3, -1, -1):
+        if STREAM_BREAK_BEFORE_RE.match(lines[i]) and STREAM_BREAK_AFTER_RE.match(lines[i + 1]):
+            cleaned_parts.append(remove_markdown_format("\n".join(lines[:i + 1]) + "\n"))
+            return "\n".join(lines[i + 1:])
+    return pending_text
+
 def read_ideas_file(filepath):
     """
     Read the ideas.txt file and return its content as a simple string.
@@ -82,6 +114,13 @@ def append_to_ideas_file(filepath, new_content, content_type):
         f.write(f"# {content_type} (Generated {datetime.now().strftime('%Y-%m-%d %H:%M')})\n\n")
         f.write(new_content)
 
+def write_text_file(filepath, parts):
+    """
+    Write the given strings to a new file in one writelines call
+    """
+    with open(filepath, 'w', encoding='utf-8') as f:
+        f.writelines(parts)
+
 def calculate_max_tokens(prompt):
     # estimate the input tokens based on a rough character count approximation
     estimated_input_tokens = int(len(prompt) // 5.5)
@@ -245,36 +284,24 @@ def generate_and_append(prompt_type):
     print(f"Estimated input/prompt tokens: {estimated_input_tokens}")
     print(f"Setting max_tokens to: {max_tokens} (requested: {args.max_tokens}, calculated safe maximum: {max_safe_tokens})")
     
-    prompt_token_count = 0
-    try:
-        response = client.beta.messages.count_tokens(
-            model="claude-3-7-sonnet-20250219",
-            messages=[{"role": "user", "content": prompt}],
-            thinking={
-                "type": "enabled",
-                "budget_tokens": args.thinking_budget
-            },
-            betas=["output-128k-2025-02-19"]
-        )
-        prompt_token_count = response.input_tokens
-        print(f"Actual input/prompt tokens: {prompt_token_count} (via client.beta.messages.count_tokens)")
-    except Exception as e:
-        print(f"Error counting tokens:\n{e}\n")
-    
-    full_response = ""
-    thinking_content = ""
-    
     start_time = time.time()
     
     dt = datetime.fromtimestamp(start_time)
-    formatted_time = dt.strftime("%A %B %d, %Y %I:%M:%S %p").replace(" 0", " ").lower()
+    # the response is spooled to disk as it streams in, so a dropped connection still leaves what
+    # arrived in the .raw file, and it's cleaned a few lines at a time so there's no big cleanup pass afterwards
+    raw_filename = f"{args.save_dir}/{prompt_type}_{dt.strftime('%Y%m%d_%H%M%S')}.raw"
+    cleaned_parts = []
+    pending_text = ""
+    thinking_content = ""
+    usage = None  # token usage reported by the API once the stream completes
+    formatted_time = f"{dt:%A %B} {dt.day}, {dt.year} {dt.hour % 12 or 12}:{dt:%M:%S}".lower() + (" am" if dt.hour < 12 else " pm")
     print(f"****************************************************************************")
     print(f"*  sending to API at: {formatted_time}")
     print(f"*  ... standby, as this usually takes a few minutes")
     print(f"****************************************************************************")
     
     try:
-        with client.beta.messages.stream(
+        with open(raw_filename, 'w', encoding='utf-8') as raw_file, client.beta.messages.stream(
             model="claude-3-7-sonnet-20250219",
             max_tokens=max_tokens,
             messages=[{"role": "user", "content": prompt}],
@@ -284,13 +311,17 @@ def generate_and_append(prompt_type):
             },
             betas=["output-128k-2025-02-19"]
         ) as stream:
-            # track both thinking and text output
-            for event in stream:
-                if event.type == "content_block_delta":
-                    if event.delta.type == "thinking_delta":
-                        thinking_content += event.delta.thinking
-                    elif event.delta.type == "text_delta":
-                        full_response += event.delta.text
+            # the SDK assembles the message itself: only the text is taken as it arrives, to spool
+            # it to disk and clean it, and the thinking is read from the final message
+            for text in stream.text_stream:
+                raw_file.write(text)
+                pending_text += text
+                # a new break can only show up when another line is complete
+                if "\n" in text:
+                    pending_text = clean_streamed_lines(pending_text, cleaned_parts)
+            final_message = stream.get_final_message()
+            usage = final_message.usage
+            thinking_content = "".join(block.thinking for block in final_message.content if block.type == "thinking")
     except Exception as e:
         print(f"\nError during API call:\n{e}\n")
     
@@ -298,37 +329,27 @@ def generate_and_append(prompt_type):
     minutes = int(elapsed // 60)
     seconds = elapsed % 60
     
-    # remove markdown from the response
-    cleaned_response = remove_markdown_format(full_response)
+    # whatever is still buffered (at least the last line) is cleaned now
+    cleaned_parts.append(remove_markdown_format(pending_text))
+    cleaned_response = "".join(cleaned_parts)
+    del cleaned_parts
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     
-    append_to_ideas_file(args.ideas_file, cleaned_response, prompt_type.capitalize())
-    
-    # Save a backup copy of the generated content as a separate file
+    # a backup copy of the generated content goes in a separate file
     backup_filename = f"{args.save_dir}/{prompt_type}_{timestamp}.txt"
-    with open(backup_filename, 'w', encoding='utf-8') as file:
-        file.write(cleaned_response)
+    thinking_filename = f"{args.save_dir}/{prompt_type}_thinking_{timestamp}.txt"
     
     output_word_count = count_words(cleaned_response)
     
     print(f"\nElapsed time: {minutes} minutes, {seconds:.2f} seconds.")
     print(f"Generated {prompt_type} has {output_word_count} words.")
     
-    output_token_count = 0
-    try:
-        response = client.beta.messages.count_tokens(
-            model="claude-3-7-sonnet-20250219",
-            messages=[{"role": "user", "content": cleaned_response}],
-            thinking={
-                "type": "enabled",
-                "budget_tokens": args.thinking_budget
-            },
-            betas=["output-128k-2025-02-19"]
-        )
-        output_token_count = response.input_tokens
-        print(f"Output is {output_token_count} tokens (via client.beta.messages.count_tokens)")
-    except Exception as e:
-        print(f"Error counting output tokens:\n{e}\n")
+    # the stream's final message already reports usage, no need for count_tokens round-trips
+    # before or after the request
+    prompt_token_count = usage.input_tokens if usage else 0
+    output_token_count = usage.output_tokens if usage else 0
+    print(f"Actual input/prompt tokens: {prompt_token_count} (via the API response usage)")
+    print(f"Output is {output_token_count} tokens, thinking plus {prompt_type} (via the API response usage)")
     
     stats = f"""
 Details:
@@ -339,26 +360,39 @@ AI model thinking budget: {args.thinking_budget} tokens
 Max output tokens: {args.max_tokens} tokens
 
 Estimated input/prompt tokens: {estimated_input_tokens}
-Actual    input/prompt tokens: {prompt_token_count} (via client.beta.messages.count_tokens)
+Actual    input/prompt tokens: {prompt_token_count} (via the API response usage)
 Setting max_tokens to: {max_tokens} (requested: {args.max_tokens}, calculated safe maximum: {max_safe_tokens})
 
 Elapsed time: {minutes} minutes, {seconds:.2f} seconds
 Output has {output_word_count} words
-Output is {output_token_count} tokens (via client.beta.messages.count_tokens)
+Output is {output_token_count} tokens, thinking plus {prompt_type} (via the API response usage)
 Content appended to: {args.ideas_file}
 Backup saved to: {backup_filename}
 ###
 """
     
+    # the ideas file, the backup copy and the thinking log don't depend on each other, write them at the same time
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        writes = [
+            pool.submit(append_to_ideas_file, args.ideas_file, cleaned_response, prompt_type.capitalize()),
+            pool.submit(write_text_file, backup_filename, [cleaned_response]),
+        ]
+        if thinking_content:
+            writes.append(pool.submit(write_text_file, thinking_filename, [
+                "=== PROMPT USED ===\n",
+                prompt,
+                "\n\n=== AI'S THINKING PROCESS ===\n\n",
+                thinking_content,
+                "\n=== END AI'S THINKING PROCESS ===\n",
+                stats
+            ]))
+        for write in writes:
+            write.result()  # raises here if a write failed
+    # the cleaned copy is safely written, the raw spool is no longer needed
+    if os.path.exists(raw_filename):
+        os.remove(raw_filename)
+    
     if thinking_content:
-        thinking_filename = f"{args.save_dir}/{prompt_type}_thinking_{timestamp}.txt"
-        with open(thinking_filename, 'w', encoding='utf-8') as file:
-            file.write("=== PROMPT USED ===\n")
-            file.write(prompt)
-            file.write("\n\n=== AI'S THINKING PROCESS ===\n\n")
-            file.write(thinking_content)
-            file.write("\n=== END AI'S THINKING PROCESS ===\n")
-            file.write(stats)
         print(f"Content appended to: {args.ideas_file}")
         print(f"Backup saved to: {backup_filename}")
         print(f"AI thinking saved to: {thinking_filename}\n")
@@ -395,6 +429,3 @@ try:
 except Exception as e:
     print(f"\nAn error occurred: {e}")
     sys.exit(1)
-finally:
-    # clean up resources
-    client = None
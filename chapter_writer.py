@@ -72,7 +72,7 @@ if args.request is None and args.chapters_to_write is None:
     sys.exit(1)
 
 def count_words(text):
-    return len(re.sub(r'(\r\n|\r|\n)', ' ', text).split())
+    return len(text.split())
 
 def clean_forbidden_punctuation(text):
     # dictionary of patterns and their replacements
@@ -107,6 +107,32 @@ def clean_forbidden_punctuation(text):
     
     return cleaned_text
 
+# the patterns used by clean_text_formatting, compiled once here rather than on every call;
+# each dash group is one alternation that replaces the dash (with whatever spacing its
+# neighbors allow it to swallow) by a comma in a single pass
+MARKDOWN_HEADER_LINE_RE = re.compile(r'^#+ .*$', re.MULTILINE)
+EM_DASH_RE = re.compile(r'(?<=\w)—(?=\w)|(?<=\w)—\s+|\s+—(?=\w)|—')
+EN_DASH_RE = re.compile(r'(?<=\w)\s*–\s*|\s*–\s*(?=\w)|–')
+# spaced hyphens stay three passes, a single alternation differs on runs like "a - - b"
+SPACED_HYPHEN_PATTERNS = [
+    (re.compile(r'(\w+)\s+-\s+(\w+)'), r'\1, \2'),
+    (re.compile(r'(\w+)\s+-\s+'), r'\1, '),
+    (re.compile(r'\s+-\s+(\w+)'), r', \1'),
+]
+# curly double and single quotes to plain ones, a single str.translate pass
+QUOTE_TRANSLATION = str.maketrans({
+    '\u201c': '"', '\u201d': '"', '\u201e': '"',
+    '\u2018': "'", '\u2019': "'", '\u201a': "'",
+})
+MARKDOWN_BOLD_RE = re.compile(r'\*\*(.*?)\*\*')
+MARKDOWN_ITALIC_RE = re.compile(r'\*(.*?)\*')
+MARKDOWN_CODE_RE = re.compile(r'`(.*?)`')
+COMMA_CLEANUP_PATTERNS = [
+    (re.compile(r',\s*,'), ','),
+    (re.compile(r'\s+,'), ','),
+    (re.compile(r',\s+'), ', '),
+]
+
 def clean_text_formatting(text):
     """
     clean text formatting by:
@@ -116,42 +142,41 @@ def clean_text_formatting(text):
     - normalizing quotes
     - removing Markdown formatting (bold, italic, code)
     """
-    # remove Markdown header before: Chapter #:
-    text = re.sub(r'^#+ .*$', '', text, flags=re.MULTILINE)
+    # each pass only runs when the character it works on is in the text at all, a substring
+    # check is far cheaper than letting the regex engine scan a chapter for nothing
     
-    # replace em dashes with commas (ensuring proper spacing)
-    text = re.sub(r'(\w+)—(\w+)', r'\1, \2', text)
-    text = re.sub(r'(\w+)—\s+', r'\1, ', text)
-    text = re.sub(r'\s+—(\w+)', r', \1', text)
-    text = re.sub(r'—', ', ', text)
+    # remove Markdown header before: Chapter #:
+    if '#' in text:
+        text = MARKDOWN_HEADER_LINE_RE.sub('', text)
     
-    # replace en dashes with commas (ensuring proper spacing)
-    text = re.sub(r'(\w+)\s*–\s*(\w+)', r'\1, \2', text)
-    text = re.sub(r'(\w+)\s*–\s*', r'\1, ', text)
-    text = re.sub(r'\s*–\s*(\w+)', r', \1', text)
-    text = re.sub(r'–', ', ', text)
+    # replace em dashes and en dashes with commas (ensuring proper spacing)
+    if '—' in text:
+        text = EM_DASH_RE.sub(', ', text)
+    if '–' in text:
+        text = EN_DASH_RE.sub(', ', text)
     
     # replace hyphens with spaces around them (used as separators)
-    text = re.sub(r'(\w+)\s+-\s+(\w+)', r'\1, \2', text)
-    text = re.sub(r'(\w+)\s+-\s+', r'\1, ', text)
-    text = re.sub(r'\s+-\s+(\w+)', r', \1', text)
-    
-    # replace double hyphens
-    text = re.sub(r'--', ',', text)
+    if '-' in text:
+        for pattern, replacement in SPACED_HYPHEN_PATTERNS:
+            text = pattern.sub(replacement, text)
+        
+        # replace double hyphens
+        text = text.replace('--', ',')
     
     # replace special quotes with regular quotes
-    text = re.sub(r'["""]', '"', text)
-    text = re.sub(r"[''']", "'", text)
+    text = text.translate(QUOTE_TRANSLATION)
     
     # remove Markdown formatting
-    text = re.sub(r'\*\*(.*?)\*\*', r'\1', text)  # Bold
-    text = re.sub(r'\*(.*?)\*', r'\1', text)      # Italic
-    text = re.sub(r'`(.*?)`', r'\1', text)        # Code
+    if '*' in text:
+        text = MARKDOWN_BOLD_RE.sub(r'\1', text)    # Bold
+        text = MARKDOWN_ITALIC_RE.sub(r'\1', text)  # Italic
+    if '`' in text:
+        text = MARKDOWN_CODE_RE.sub(r'\1', text)    # Code
     
     # clean up any double commas or extra spaces around commas
-    text = re.sub(r',\s*,', ',', text)
-    text = re.sub(r'\s+,', ',', text)
-    text = re.sub(r',\s+', ', ', text)
+    if ',' in text:
+        for pattern, replacement in COMMA_CLEANUP_PATTERNS:
+            text = pattern.sub(replacement, text)
     
     return text
 
@@ -328,31 +353,10 @@ IMPORTANT:
 - In your 'thinking' before writing always indicate and explain what you're using from: WORLD, OUTLINE, and MANUSCRIPT (previous chapters){dialogue_option}{character_restriction}
 """
 
-    # create a version of the prompt without the outline, world, manuscript:
-    prompt_for_logging = f"""You are a skilled novelist writing {formatted_outline_request} in fluent, authentic {args.lang}. 
-Draw upon your knowledge of worldwide literary traditions, narrative techniques, and creative approaches from across cultures, while expressing everything in natural, idiomatic {args.lang} that honors its unique linguistic character.
-
-Consider the following in your thinking:
-- IMPORTANT: always review the included OUTLINE thoroughly 
-- Refer to the included WORLD of characters and settings, if provided
-- How this chapter advances the overall narrative and character development
-- Creating compelling opening and closing scenes
-- Incorporating sensory details and vivid descriptions
-- Maintaining consistent tone and style with previous chapters
-
-IMPORTANT:
-- NO Markdown formatting
-- Use hyphens only for legitimate {args.lang} words
-- Begin with: {formatted_outline_request} and write in plain text only
-- Write 2,000-3,000 words
-- Do not repeat content from existing chapters
-- Do not start working on the next chapter
-- Maintain engaging narrative pacing through varied sentence structure, strategic scene transitions, and appropriate balance between action, description, and reflection
-- Prioritize natural, character-revealing dialogue as the primary narrative vehicle, ensuring each conversation serves multiple purposes (character development, plot advancement, conflict building). Include distinctive speech patterns for different characters, meaningful subtext, and strategic dialogue beats, while minimizing lengthy exposition and internal reflection.
-- Write all times in 12-hour numerical format with a space before lowercase am/pm (e.g., "10:30 am," "2:15 pm," "7:00 am") rather than spelling them out as words or using other formats
-- Prioritize lexical diversity by considering multiple alternative word choices before finalizing each sentence. For descriptive passages especially, select precise, context-specific terminology rather than relying on common metaphorical language. When using figurative language, vary the sensory domains from which metaphors are drawn (visual, auditory, tactile, etc.). Actively monitor your own patterns of word selection across paragraphs and deliberately introduce variation.
-- In your 'thinking' before writing always indicate and explain what you're using from: WORLD, OUTLINE, and MANUSCRIPT (previous chapters){dialogue_option}{character_restriction}
-note: The actual prompt included the outline, world, manuscript which are not logged to save space.
+    # the version of the prompt for the thinking log is the real prompt minus the leading
+    # outline, world, manuscript blocks, so the two can't drift apart
+    manuscript_end = "=== END EXISTING MANUSCRIPT ===\n"
+    prompt_for_logging = prompt[prompt.rfind(manuscript_end) + len(manuscript_end):].lstrip("\n") + """note: The actual prompt included the outline, world, manuscript which are not logged to save space.
 """
 
     client = anthropic.Anthropic(
@@ -420,8 +424,8 @@ note: The actual prompt included the outline, world, manuscript which are not lo
         print(f"{claude_api_note}")
         sys.exit(1)
 
-    full_response = ""
-    thinking_content = ""
+    full_response_parts = []
+    thinking_parts = []
 
     start_time = time.time()
 
@@ -440,13 +444,16 @@ note: The actual prompt included the outline, world, manuscript which are not lo
             for event in stream:
                 if event.type == "content_block_delta":
                     if event.delta.type == "thinking_delta":
-                        thinking_content += event.delta.thinking
+                        thinking_parts.append(event.delta.thinking)
                     elif event.delta.type == "text_delta":
-                        full_response += event.delta.text
+                        full_response_parts.append(event.delta.text)
     except Exception as e:
         print(f"\n*** Error during generation:\n{e}\n")
         return None
 
+    full_response = "".join(full_response_parts)
+    thinking_content = "".join(thinking_parts)
+
     elapsed = time.time() - start_time
     minutes = int(elapsed // 60)
     seconds = elapsed % 60
@@ -563,15 +570,6 @@ Notes:
     
     print(f"Completed Chapter {chapter_num}: {chapter_word_count} words ({minutes}m {seconds:.2f}s) - saved to: {os.path.basename(chapter_filename)}")
     
-    # clean up references
-    outline_content = None
-    world_content = None
-    novel_content = None
-    full_response = None
-    cleaned_text = None
-    cleaned_response = None
-    thinking_content = None
-    
     return {
         "chapter_num": chapter_num,
         "word_count": chapter_word_count,
@@ -637,7 +635,3 @@ if args.chapters_to_write:
 else:
     # process single chapter using the --request parameter
     process_chapter(args.request)
-
-# clean up
-client = None
-
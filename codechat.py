@@ -27,7 +27,7 @@ parser.add_argument('--save_dir', type=str, default=".")
 args = parser.parse_args()
 
 def count_words(text):
-    return len(re.sub(r'(\r\n|\r|\n)', ' ', text).split())
+    return len(text.split())
 
 def read_file(filepath):
     """
@@ -172,13 +172,13 @@ def process_code():
     
     print(f"\n--- Processing Code ---")
     
-    full_response = ""
-    thinking_content = ""
+    full_response_parts = []
+    thinking_parts = []
     
     start_time = time.time()
     
     dt = datetime.fromtimestamp(start_time)
-    formatted_time = dt.strftime("%A %B %d, %Y %I:%M:%S %p").replace(" 0", " ").lower()
+    formatted_time = f"{dt:%A %B} {dt.day}, {dt.year} {dt.hour % 12 or 12}:{dt:%M:%S}".lower() + (" am" if dt.hour < 12 else " pm")
     print(f"****************************************************************************")
     print(f"*  sending to API at: {formatted_time}")
     print(f"*  ... standby, as this usually takes a few minutes")
@@ -199,12 +199,15 @@ def process_code():
             for event in stream:
                 if event.type == "content_block_delta":
                     if event.delta.type == "thinking_delta":
-                        thinking_content += event.delta.thinking
+                        thinking_parts.append(event.delta.thinking)
                     elif event.delta.type == "text_delta":
-                        full_response += event.delta.text
+                        full_response_parts.append(event.delta.text)
     except Exception as e:
         print(f"\nError during API call:\n{e}\n")
     
+    full_response = "".join(full_response_parts)
+    thinking_content = "".join(thinking_parts)
+    
     elapsed = time.time() - start_time
     minutes = int(elapsed // 60)
     seconds = elapsed % 60
@@ -308,7 +311,3 @@ try:
 except Exception as e:
     print(f"\nAn error occurred: {e}")
     sys.exit(1)
-finally:
-    # clean up resources
-    client = None
-
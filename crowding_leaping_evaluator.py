@@ -304,8 +304,8 @@ def run_crowding_leaping_analysis(manuscript_content, args):
         print(f"Error: prompt is too large to have a {args.thinking_budget_tokens} thinking budget!")
         sys.exit(1)
     
-    full_response = ""
-    thinking_content = ""
+    full_response_parts = []
+    thinking_parts = []
     
     start_time = time.time()
     print(f"Sending request to Claude API...")
@@ -324,13 +324,16 @@ def run_crowding_leaping_analysis(manuscript_content, args):
             for event in stream:
                 if event.type == "content_block_delta":
                     if event.delta.type == "thinking_delta":
-                        thinking_content += event.delta.thinking
+                        thinking_parts.append(event.delta.thinking)
                     elif event.delta.type == "text_delta":
-                        full_response += event.delta.text
+                        full_response_parts.append(event.delta.text)
     except Exception as e:
         print(f"\nAPI Error:\n{e}\n")
         return "", "", 0, 0
     
+    full_response = "".join(full_response_parts)
+    thinking_content = "".join(thinking_parts)
+    
     elapsed = time.time() - start_time
     minutes = int(elapsed // 60)
     seconds = elapsed % 60
@@ -30,7 +30,7 @@ parser.add_argument('--allow_new_characters', action='store_true', help='Allow c
 args = parser.parse_args()
 
 def count_words(text):
-    return len(re.sub(r'(\r\n|\r|\n)', ' ', text).split())
+    return len(text.split())
 
 def remove_markdown_format(text):
     """
@@ -40,7 +40,7 @@ def remove_markdown_format(text):
     - Remove any other Markdown formatting (bold, italic, code)
     """
     # Replace Markdown headers with plain text format
-    text = re.sub(r'^#{1,6}\s+(.*?)$', r'\1', text, flags=re.MULTILINE)
+    text = re.sub(r'^#{1,6}\s+(.*)$', r'\1', text, flags=re.MULTILINE)
     
     # Replace special quotes with regular quotes
     text = re.sub(r'["""]', '"', text)
@@ -261,13 +261,13 @@ def generate_and_append(prompt_type):
     except Exception as e:
         print(f"Error counting tokens:\n{e}\n")
     
-    full_response = ""
-    thinking_content = ""
+    full_response_parts = []
+    thinking_parts = []
     
     start_time = time.time()
     
     dt = datetime.fromtimestamp(start_time)
-    formatted_time = dt.strftime("%A %B %d, %Y %I:%M:%S %p").replace(" 0", " ").lower()
+    formatted_time = f"{dt:%A %B} {dt.day}, {dt.year} {dt.hour % 12 or 12}:{dt:%M:%S}".lower() + (" am" if dt.hour < 12 else " pm")
     print(f"****************************************************************************")
     print(f"*  sending to API at: {formatted_time}")
     print(f"*  ... standby, as this usually takes a few minutes")
@@ -288,12 +288,15 @@ def generate_and_append(prompt_type):
             for event in stream:
                 if event.type == "content_block_delta":
                     if event.delta.type == "thinking_delta":
-                        thinking_content += event.delta.thinking
+                        thinking_parts.append(event.delta.thinking)
                     elif event.delta.type == "text_delta":
-                        full_response += event.delta.text
+                        full_response_parts.append(event.delta.text)
     except Exception as e:
         print(f"\nError during API call:\n{e}\n")
     
+    full_response = "".join(full_response_parts)
+    thinking_content = "".join(thinking_parts)
+    
     elapsed = time.time() - start_time
     minutes = int(elapsed // 60)
     seconds = elapsed % 60
@@ -395,6 +398,3 @@ try:
 except Exception as e:
     print(f"\nAn error occurred: {e}")
     sys.exit(1)
-finally:
-    # clean up resources
-    client = None
@@ -13,7 +13,6 @@ import anthropic
 
 import os
 import argparse
-import re
 import sys
 import time
 from datetime import datetime
@@ -94,7 +93,7 @@ def read_file(file_path, file_type):
 
 
 def count_words(text):
-    return len(re.sub(r'(\r\n|\r|\n)', ' ', text).split())
+    return len(text.split())
 
 
 def strip_markdown(md_text):
@@ -328,8 +327,9 @@ def run_foreshadowing_analysis(foreshadowing_type, outline_content, manuscript_c
         print(f"Error: prompt is too large to have a {args.thinking_budget_tokens} thinking budget!")
         sys.exit(1)
     
-    full_response = ""
-    thinking_content = ""
+    full_response_parts = []
+    thinking_parts = []
+    full_response_length = 0  # running length, for the progress dots
     
     system_prompt = "NO Markdown! Never respond with Markdown formatting, plain text only."
     
@@ -351,16 +351,20 @@ def run_foreshadowing_analysis(foreshadowing_type, outline_content, manuscript_c
             for event in stream:
                 if event.type == "content_block_delta":
                     if event.delta.type == "thinking_delta":
-                        thinking_content += event.delta.thinking
+                        thinking_parts.append(event.delta.thinking)
                     elif event.delta.type == "text_delta":
-                        full_response += event.delta.text
+                        full_response_parts.append(event.delta.text)
+                        full_response_length += len(event.delta.text)
                         # Print progress indicator
-                        if len(full_response) % 1000 == 0:
+                        if full_response_length % 1000 == 0:
                             print(".", end="", flush=True)
     except Exception as e:
         print(f"\nAPI Error: {e}")
         return "", "", 0, 0
     
+    full_response = "".join(full_response_parts)
+    thinking_content = "".join(thinking_parts)
+    
     elapsed = time.time() - start_time
     minutes = int(elapsed // 60)
     seconds = elapsed % 60
@@ -1,8 +1,12 @@
 import json
+from pathlib import Path
 from tinydb import TinyDB
+from tinydb.storages import JSONStorage
+from tinydb.middlewares import CachingMiddleware
 
 # Open the TinyDB database file named 'writers_toolkit.json'
-db = TinyDB('writers_toolkit.json')
+# CachingMiddleware keeps writes in memory until the database is closed
+db = TinyDB('writers_toolkit.json', storage=CachingMiddleware(JSONStorage))
 
 # Get references to the two tables: one for tools and one for global settings.
 tools_table = db.table('tools')
@@ -13,22 +17,18 @@ tools_table.truncate()
 settings_table.truncate()
 
 # Read configuration from the file 'tools_config.json'
-with open("tools_config.json", "r") as f:
-    config = json.load(f)
-
-# Insert each top-level key appropriately.
-for key, value in config.items():
-    if key == "_global_settings":
-        # Insert global settings into the settings table
-        settings_table.insert(value)
-    else:
-        # Insert tool configuration into the tools table.
-        # Ensure the document has a "name" key.
-        tool_doc = {"name": key}
-        tool_doc.update(value)
-        tools_table.insert(tool_doc)
+config = json.loads(Path("tools_config.json").read_bytes())
+
+# Split the top-level keys into global settings and tool configurations.
+# Each tool document gets a "name" key holding its script name.
+global_settings = [config["_global_settings"]] if "_global_settings" in config else []
+tool_docs = [{"name": key, **value} for key, value in config.items() if key != "_global_settings"]
+
+# Insert each table's documents in one batch
+settings_table.insert_multiple(global_settings)
+tools_table.insert_multiple(tool_docs)
 
 print("Configuration has been successfully inserted into 'writers_toolkit.json'")
 
-# Explicitly close the database
+# Explicitly close the database (this also flushes the cached writes to disk)
 db.close()
@@ -1,6 +1,65 @@
+import atexit
+import json
+import os
+import socket
+import subprocess
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
 import pypandoc
 
+# One long-lived "pandoc server" process serves every conversion, so repeated
+# calls to remove_markdown don't each pay for starting a new pandoc process.
+# It listens on a port the OS reports free, never a fixed one that some other
+# local service might already hold (and then answer our probe and requests).
+pandoc_server = None
+pandoc_server_port = None
+
+def find_free_port():
+    """Return a localhost port that nothing is listening on right now."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+def start_pandoc_server(timeout=5.0):
+    """Start pandoc in server mode once; return True if it is accepting requests."""
+    global pandoc_server, pandoc_server_port
+    if pandoc_server is None:
+        pandoc_server_port = find_free_port()
+        try:
+            pandoc_server = subprocess.Popen(
+                ["pandoc", "server", "--port", str(pandoc_server_port)],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
+            )
+        except OSError:
+            return False
+        atexit.register(pandoc_server.terminate)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline and pandoc_server.poll() is None:
+            try:
+                socket.create_connection(("localhost", pandoc_server_port), timeout=0.1).close()
+                break
+            except OSError:
+                time.sleep(0.05)
+    return pandoc_server.poll() is None
+
+def convert_with_pandoc_server(md_text):
+    request = urllib.request.Request(
+        f"http://localhost:{pandoc_server_port}/",
+        data=json.dumps({"text": md_text, "from": "markdown", "to": "plain"}).encode('utf-8'),
+        headers={"Content-Type": "application/json", "Accept": "text/plain"}
+    )
+    with urllib.request.urlopen(request) as response:
+        return response.read().decode('utf-8')
+
 def remove_markdown(md_text):
+    try:
+        if start_pandoc_server():
+            return convert_with_pandoc_server(md_text)
+    except Exception as e:
+        print(f"pandoc server conversion failed, falling back to pypandoc: {e}")
     try:
         return pypandoc.convert_text(md_text, 'plain', format='markdown')
     except Exception as e:
@@ -8,9 +67,21 @@ def remove_markdown(md_text):
         print("Make sure pypandoc and pandoc are properly installed.")
         return md_text  # return original text if conversion fails
 
-def main():
-    # A more comprehensive set of Markdown syntax, with triple backticks escaped:
-    markdown_examples = r"""
+# The conversions themselves run inside pandoc, so threads are enough to keep
+# every core busy; a single pool is reused for all batches.
+conversion_pool = None
+
+def remove_markdown_batch(docs):
+    """Convert a list of markdown documents to plain text concurrently, keeping order."""
+    global conversion_pool
+    if conversion_pool is None:
+        conversion_pool = ThreadPoolExecutor(max_workers=os.cpu_count())
+        atexit.register(conversion_pool.shutdown)
+    start_pandoc_server()  # start it once here rather than racing in each worker
+    return list(conversion_pool.map(remove_markdown, docs))
+
+# A more comprehensive set of Markdown syntax, with triple backticks escaped:
+MARKDOWN_EXAMPLES = r"""
 # Heading 1
 ## Heading 2
 ### Heading 3
@@ -78,8 +149,9 @@ Raw URL: http://www.example.org
 That's it!
 """
 
+def main():
     # Convert to plain text
-    plain_output = remove_markdown(markdown_examples)
+    plain_output = remove_markdown(MARKDOWN_EXAMPLES)
     print("CONVERTED OUTPUT:")
     print("-" * 40)
     print(plain_output)
@@ -1,15 +1,23 @@
 # outline_writer --premise_file premise.txt --concept_file concept.txt --sections 4 --chapters 25 --detailed --title "Tracking the Dead Wax" --genre "Private eye fiction noir" --example_outline outline_XXX.txt
 # Usage: python -B outline_writer.py --premise_file premise.txt --concept_file taropian.txt --sections 4 --chapters 24 --detailed --title "Dire Consequences" --genre "Science Fiction Noir" --example_outline outline_XXX.txt
 # pip install anthropic
+# optional: pip install httpx[http2]   (lets batch runs share one HTTP/2 connection)
 # tested with: anthropic 0.49.0 circa March 2025
-import anthropic
 import os
 import argparse
+import asyncio
+import json
 import re
 import sys
 import time
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
+# one definition of the model and beta headers; the prompt cache is keyed on these,
+# so every request has to send exactly the same values
+MODEL = "claude-3-7-sonnet-20250219"
+BETAS = ["output-128k-2025-02-19"]
 
 # create the parser with a description
 parser = argparse.ArgumentParser(description='Generate a novel outline based on high-level concept and any additional information.')
@@ -54,23 +62,53 @@ output_group.add_argument('--detailed', action='store_true',
                         help='Generate a more detailed outline with chapter summaries')
 output_group.add_argument('--save_dir', type=str, default=".",
                         help='Put outline_timestamp.txt here')
-args = parser.parse_args()
-
-# verify that premise_file exists and read its content
-try:
-    with open(args.premise_file, 'r', encoding='utf-8') as file:
-        premise_content = file.read()
-    print(f"Loaded premise from: {args.premise_file}")
-except FileNotFoundError:
-    print(f"Error: Premise file not found: {args.premise_file}")
-    print("Please provide a valid premise file.")
-    sys.exit(1)
-except Exception as e:
-    print(f"Error: Could not read premise file: {e}")
-    sys.exit(1)
+output_group.add_argument('--no_thinking_log', action='store_true',
+                        help="Don't collect the AI's thinking or write the outline_thinking_timestamp.txt file")
+output_group.add_argument('--batch_config', type=str, default=None,
+                        help='JSON file with a list of runs, like [{"title": "X", "genre": "Y", "chapters": 24, "sections": 4}, ...]; '
+                             'each run reuses the loaded files and the cached prompt prefix (optional)')
+
+# about 250k tokens, more than the whole context window, so a bigger input file can only be a mistake
+MAX_INPUT_FILE_BYTES = 1_000_000
+
+def read_input_file(path):
+    """Read a text file, returning (content, exception) with exception None on success."""
+    if not path:
+        return "", None
+    try:
+        return Path(path).read_text(encoding='utf-8'), None
+    except Exception as e:
+        return "", e
 
 def count_words(text):
-    return len(re.sub(r'(\r\n|\r|\n)', ' ', text).split())
+    # str.split() with no argument already splits on any run of whitespace, including \r and \n
+    return len(text.split())
+
+# the === NAME === ... === END NAME === reference blocks in the prompt, left out of the thinking log
+PROMPT_REFERENCE_BLOCK_RE = re.compile(
+    r'=== (PREMISE|CONCEPT|CHARACTERS|EXAMPLE OUTLINE FORMAT) ===\n.*?=== END \1 ===\n+', re.DOTALL
+)
+
+# patterns used by remove_markdown_format, compiled once
+MD_CHAPTER_HEADER_RE = re.compile(r'^#{1,6}\s+Chapter\s+(\d+):\s+(.*?)$', re.MULTILINE)
+MD_PART_HEADER_RE = re.compile(r'^#{1,6}\s+PART\s+([IVXLCDM]+):\s+(.*)$', re.MULTILINE)
+MD_HEADER_RE = re.compile(r'^#{1,6}\s+(.*)$', re.MULTILINE)
+POV_LINE_END_RE = re.compile(r'POV:\s+\w+\s*$', re.MULTILINE)
+POV_LINE_RE = re.compile(r'POV:\s+\w+\s*\n', re.MULTILINE)
+# curly double and single quotes to plain ones, a single str.translate pass
+QUOTE_TRANSLATION = str.maketrans({
+    '\u201c': '"', '\u201d': '"', '\u201e': '"',
+    '\u2018': "'", '\u2019': "'", '\u201a': "'",
+})
+# bold, italic and code stay three passes, one alternation differs on nested emphasis like "*a `b` c*"
+MD_BOLD_RE = re.compile(r'\*\*(.*?)\*\*')
+MD_ITALIC_RE = re.compile(r'\*(.*?)\*')
+MD_CODE_RE = re.compile(r'`(.*?)`')
+BULLET_RE = re.compile(r'^\s*[-*+]\s+', re.MULTILINE)
+# runs of spaces, and spaces around a line break, in one pass
+SPACES_RE = re.compile(r' *\n *| +')
+# "Chapter N: Title" lines left once the headers and spaces are cleaned up
+CHAPTER_LINE_RE = re.compile(r'^Chapter\s+(\d+):\s+(.*?)$', re.MULTILINE)
 
 def remove_markdown_format(text):
     """
@@ -81,153 +119,374 @@ def remove_markdown_format(text):
     - Remove any other Markdown formatting (bold, italic, code)
     - Clean up to ensure simple chapter numbering format
     """
+    # each pass only runs when the text has the character(s) it needs to match, the model is
+    # asked for plain text, so most of the passes usually have nothing to do
+    
     # Replace Markdown headers with plain text format
-    text = re.sub(r'^#{1,6}\s+Chapter\s+(\d+):\s+(.*?)$', r'\1. \2', text, flags=re.MULTILINE)
-    text = re.sub(r'^#{1,6}\s+PART\s+([IVXLCDM]+):\s+(.*?)$', r'PART \1: \2', text, flags=re.MULTILINE)
-    text = re.sub(r'^#{1,6}\s+(.*?)$', r'\1', text, flags=re.MULTILINE)
+    if '#' in text:
+        text = MD_CHAPTER_HEADER_RE.sub(r'\1. \2', text)
+        text = MD_PART_HEADER_RE.sub(r'PART \1: \2', text)
+        text = MD_HEADER_RE.sub(r'\1', text)
     
     # Remove POV markers
-    text = re.sub(r'POV:\s+\w+\s*$', '', text, flags=re.MULTILINE)
-    text = re.sub(r'POV:\s+\w+\s*\n', '\n', text, flags=re.MULTILINE)
+    if 'POV:' in text:
+        text = POV_LINE_END_RE.sub('', text)
+        text = POV_LINE_RE.sub('\n', text)
     
     # Replace special quotes with regular quotes
-    text = re.sub(r'["""]', '"', text)
-    text = re.sub(r"[''']", "'", text)
+    text = text.translate(QUOTE_TRANSLATION)
     
-    # Remove Markdown formatting
-    text = re.sub(r'\*\*(.*?)\*\*', r'\1', text)  # Bold
-    text = re.sub(r'\*(.*?)\*', r'\1', text)      # Italic
-    text = re.sub(r'`(.*?)`', r'\1', text)        # Code
-    text = re.sub(r'^\s*[-*+]\s+', '- ', text, flags=re.MULTILINE)  # Standardize bullet points
+    # Remove Markdown formatting (bold, italic, code)
+    if '*' in text:
+        text = MD_BOLD_RE.sub(r'\1', text)    # Bold
+        text = MD_ITALIC_RE.sub(r'\1', text)  # Italic
+    if '`' in text:
+        text = MD_CODE_RE.sub(r'\1', text)    # Code
+    if '-' in text or '*' in text or '+' in text:
+        text = BULLET_RE.sub('- ', text)  # Standardize bullet points
     
-    # Clean up any extra spaces but preserve line breaks
-    text = re.sub(r' +', ' ', text)
-    text = re.sub(r' +\n', '\n', text)
-    text = re.sub(r'\n +', '\n', text)
+    # Clean up any extra spaces but preserve line breaks (a lone space is left as it is anyway)
+    if '  ' in text or ' \n' in text or '\n ' in text:
+        text = SPACES_RE.sub(lambda m: '\n' if '\n' in m.group() else ' ', text)
     
     # Ensure consistent chapter formatting when numbers are present
-    text = re.sub(r'^Chapter\s+(\d+):\s+(.*?)$', r'\1. \2', text, flags=re.MULTILINE)
+    if 'Chapter' in text:
+        text = CHAPTER_LINE_RE.sub(r'\1. \2', text)
     
     return text
 
-# Load example outline if provided
-example_outline_content = ""
-if args.example_outline:
-    try:
-        with open(args.example_outline, 'r', encoding='utf-8') as file:
-            example_outline_content = file.read()
-        print(f"Loaded example outline from: {args.example_outline}")
-    except FileNotFoundError:
-        print(f"Note: Example outline file not found: {args.example_outline}")
-        print("Continuing without example outline.")
-    except Exception as e:
-        print(f"Warning: Could not read example outline file: {e}")
-        print("Continuing without example outline.")
-
-# Load concept file if provided
-concept_content = ""
-if args.concept_file:
-    try:
-        with open(args.concept_file, 'r', encoding='utf-8') as file:
-            concept_content = file.read()
-        print(f"Loaded concept from: {args.concept_file}")
-    except FileNotFoundError:
-        print(f"Note: Concept file not found: {args.concept_file}")
-        print("Continuing with just the premise description.")
-    except Exception as e:
-        print(f"Warning: Could not read concept file: {e}")
-        print("Continuing with just the premise description.")
-
-# load characters file if provided
-characters_content = ""
-if args.characters_file:
-    try:
-        with open(args.characters_file, 'r', encoding='utf-8') as file:
-            characters_content = file.read()
-        print(f"Loaded characters from: {args.characters_file}")
-    except FileNotFoundError:
-        print(f"Note: Characters file not found: {args.characters_file}")
-        print("Continuing without characters information.")
-    except Exception as e:
-        print(f"Warning: Could not read characters file: {e}")
-        print("Continuing without characters information.")
-
-# Title and genre placeholders
-title_suggestion = f"Suggested title: {args.title}" if args.title else "Please create an appropriate title for this novel."
-genre_suggestion = f"Genre: {args.genre}" if args.genre else ""
-
-# create prompt with explicit instructions for AI
-prompt = f"""You are a skilled novelist and story architect helping to create a detailed novel outline in fluent, authentic {args.lang}.
-Draw upon your knowledge of worldwide literary traditions, narrative structure, and plot development approaches from across cultures,
-while expressing everything in natural, idiomatic {args.lang} that honors its unique linguistic character.
+# a line break that none of the patterns above can match across, so the text on either side can
+# be cleaned separately: the line before ends in a letter, digit or closing punctuation and isn't
+# a dangling "Chapter", no POV marker is still open (its name may be on a later line), and the
+# (complete) line after starts with a letter, digit, "-"/"+" bullet or a "# " header
+STREAM_BREAK_BEFORE_RE = re.compile(r'^(?!.*Chapter$).*[\w.!?)\]"\']$')
+STREAM_OPEN_POV_RE = re.compile(r'POV:[^.!?]*\Z')
+STREAM_BREAK_AFTER_RE = re.compile(r'[\w+-]|#+ +[^\s*`]')
 
+def clean_streamed_lines(pending_text, cleaned_parts):
+    """
+    Clean the streamed outline text up to the last safe line break with remove_markdown_format,
+    appending it to cleaned_parts, and return the rest to keep buffering. Cleaning the pieces
+    gives the same result as cleaning the whole outline at the end.
+    """
+    lines = pending_text.split("\n")
+    # the last item is a partial line still streaming in, so the line after a break must come before it
+    for i in range(len(lines) - 3, -1, -1):
+        if STREAM_BREAK_BEFORE_RE.match(lines[i]) and STREAM_BREAK_AFTER_RE.match(lines[i + 1]):
+            head = "\n".join(lines[:i + 1])
+            if not STREAM_OPEN_POV_RE.search(head):
+                cleaned_parts.append(remove_markdown_format(head + "\n"))
+                return "\n".join(lines[i + 1:])
+    return pending_text
+
+def write_outline_file(outline_filename, cleaned_response, raw_filename):
+    with open(outline_filename, 'w', encoding='utf-8', buffering=1 << 20) as file:
+        file.write(cleaned_response)
+    # the cleaned outline is safely written, the raw spool is no longer needed
+    raw_filename.unlink(missing_ok=True)
+
+def write_thinking_file(thinking_filename, parts):
+    # one writelines call through a 1 MiB buffer, the thinking text alone can be 100+ KB
+    with open(thinking_filename, 'w', encoding='utf-8', buffering=1 << 20) as file:
+        file.writelines(parts)
+
+async def generate_outline(client, args, prompt_instructions, prompt_references, premise_content,
+                           title, genre, chapters, sections):
+    """
+    Build the per-run part of the prompt, stream the outline from the API, and save
+    the outline and thinking files. The instructions and reference material are
+    shared by every run, so repeated calls reuse the cached prompt prefix.
+    """
+    save_dir = Path(args.save_dir)
+    absolute_path = str(save_dir.resolve())
+    
+    # Title and genre placeholders
+    title_suggestion = f"Suggested title: {title}" if title else "Please create an appropriate title for this novel."
+    genre_suggestion = f"Genre: {genre}" if genre else ""
+    
+    prompt_request = f"""
 === PREMISE ===
 {premise_content}
 === END PREMISE ===
 
-=== CONCEPT ===
-{concept_content}
-=== END CONCEPT ===
-
-=== CHARACTERS ===
-{characters_content}
-=== END CHARACTERS ===
-
-=== EXAMPLE OUTLINE FORMAT ===
-{example_outline_content}
-=== END EXAMPLE OUTLINE FORMAT ===
-
-Create a detailed novel outline with approximately {args.chapters} chapters organized into {args.sections} main parts or sections.
+Create a detailed novel outline with approximately {chapters} chapters organized into {sections} main parts or sections.
 {title_suggestion}
 {genre_suggestion}
 Your outline should follow the general format and level of detail shown in the example (if provided), while being completely original.
+"""
+    
+    prompt = prompt_instructions + prompt_references + prompt_request
+    
+    # send the prompt as three content blocks, with cache breakpoints after the instructions and the
+    # reference material; reruns within a few minutes read that prefix from the prompt cache (cheaper and faster)
+    messages = [{
+        "role": "user",
+        "content": [
+            {"type": "text", "text": prompt_instructions, "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": prompt_references, "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": prompt_request}
+        ]
+    }]
+    
+    # calculate a safe max_tokens value
+    # estimate the input tokens based on a rough character count approximation
+    estimated_input_tokens = int(len(prompt) // 5.5)
+    max_safe_tokens = max(5000, args.context_window - estimated_input_tokens - 1000)  # 1000 token buffer for safety
+    # use the minimum of the requested max_tokens and what we calculated as safe:
+    max_tokens = int(min(args.max_tokens, max_safe_tokens))
+    
+    print(f"Max request timeout: {args.request_timeout} seconds")
+    print(f"Max retries: 0 (anthropic's default was 2)")
+    print(f"Max AI model context window: {args.context_window} tokens")
+    print(f"AI model thinking budget: {args.thinking_budget} tokens")
+    print(f"Max output tokens: {args.max_tokens} tokens")
+    print(f"Setting max_tokens to: {max_tokens} (requested: {args.max_tokens}, calculated safe maximum: {max_safe_tokens})")
+    
+    # ensure max_tokens is always greater than thinking budget
+    if max_tokens <= args.thinking_budget:
+        max_tokens = args.thinking_budget + args.max_tokens
+        print(f"Adjusted max_tokens to {max_tokens} to exceed thinking budget of {args.thinking_budget} (room for thinking/writing)")
+    
+    print(f"Estimated input/prompt tokens: {estimated_input_tokens}")
+    
+    # collect streamed deltas in lists and join once at the end, instead of repeated string +=;
+    # the outline is cleaned a line at a time as it arrives, so there's no big cleanup pass afterwards
+    cleaned_parts = []
+    pending_text = ""
+    thinking_parts = []
+    usage = None  # token usage reported by the API once the stream completes
+    
+    start_time = time.time()
+    
+    dt = datetime.fromtimestamp(start_time)
+    # the outline text is also spooled to disk as it streams in, so a dropped connection keeps what arrived
+    raw_filename = save_dir / f"outline_{dt.strftime('%Y%m%d_%H%M%S')}.raw"
+    formatted_time = f"{dt:%A %B} {dt.day}, {dt.year} {dt.hour % 12 or 12}:{dt:%M:%S}".lower() + (" am" if dt.hour < 12 else " pm")
+    # write the banner in one go rather than a dozen separate prints
+    banner = "\n".join([
+        "****************************************************************************",
+        f"*  sending to API at: {formatted_time}",
+        "*  ... standby, as this usually takes a few minutes",
+        "*  ",
+        "*  It's recommended to keep the Terminal or command line the sole 'focus'",
+        "*  and to avoid browsing online or running other apps, as these API",
+        "*  network connections are often flakey, like delicate echoes of whispers.",
+        "*  ",
+        "*  So breathe, remove eye glasses, stretch, relax, and be like water 🥋 🧘🏽‍♀️",
+        "****************************************************************************",
+    ])
+    sys.stdout.write(banner + "\n")
+    sys.stdout.flush()
+    
+    try:
+        with open(raw_filename, 'w', encoding='utf-8') as raw_file:
+            async with client.beta.messages.stream(
+                model=MODEL,
+                max_tokens=max_tokens,
+                messages=messages,
+                thinking={"type": "enabled", "budget_tokens": args.thinking_budget},
+                betas=BETAS
+            ) as stream:
+                # track both thinking and text output
+                async for event in stream:
+                    if event.type == "content_block_delta":
+                        if event.delta.type == "thinking_delta":
+                            # the thinking is only kept when it will be written to the thinking log
+                            if not args.no_thinking_log:
+                                thinking_parts.append(event.delta.thinking)
+                        elif event.delta.type == "text_delta":
+                            raw_file.write(event.delta.text)
+                            pending_text += event.delta.text
+                            # a new break can only show up when another line is complete
+                            if "\n" in event.delta.text:
+                                pending_text = clean_streamed_lines(pending_text, cleaned_parts)
+                usage = (await stream.get_final_message()).usage
+                print(f"Prompt cache: {usage.cache_read_input_tokens or 0} tokens read, {usage.cache_creation_input_tokens or 0} tokens written")
+    except Exception as e:
+        print(f"Error:\n{e}\n")
+    
+    elapsed = time.time() - start_time
+    minutes = int(elapsed // 60)
+    seconds = elapsed % 60
+    
+    # whatever is still buffered (at least the last line) is cleaned now
+    cleaned_parts.append(remove_markdown_format(pending_text))
+    cleaned_response = "".join(cleaned_parts)
+    thinking_content = "".join(thinking_parts)
+    # the joined strings are all that's needed from here on
+    del cleaned_parts, thinking_parts
+    
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    outline_filename = save_dir / f"outline_{timestamp}.txt"
+    # start saving the outline in a worker thread while the stats and thinking log are put together
+    outline_saved = asyncio.create_task(asyncio.to_thread(write_outline_file, outline_filename, cleaned_response, raw_filename))
+    
+    outline_word_count = count_words(cleaned_response)
+    
+    print(f"\nelapsed time: {minutes} minutes, {seconds:.2f} seconds.")
+    print(f"\nOutline has {outline_word_count} words.")
+    
+    # the stream's final message already reports usage, no need for count_tokens round-trips;
+    # input_tokens excludes the cached part of the prompt, so add the cache reads and writes back in
+    output_token_count = usage.output_tokens if usage else 0
+    cache_read_tokens = (usage.cache_read_input_tokens or 0) if usage else 0
+    cache_write_tokens = (usage.cache_creation_input_tokens or 0) if usage else 0
+    prompt_token_count = (usage.input_tokens + cache_read_tokens + cache_write_tokens) if usage else 0
+    print(f"Actual input/prompt tokens: {prompt_token_count} (via the API response usage)")
+    print(f"Output is {output_token_count} tokens, thinking plus outline (via the API response usage)")
+    
+    stats = f"""
+Details:
+Max request timeout: {args.request_timeout} seconds
+Max retries: 0 (anthropic's default was 2)
+Max AI model context window: {args.context_window} tokens
+AI model thinking budget: {args.thinking_budget} tokens
+Max output tokens: {args.max_tokens} tokens
 
-Consider the following in your thinking:
-- Refer to the included CHARACTERS, if provided
-- Follow the structure of the EXAMPLE OUTLINE, if provided, but make proper adjustments for this novel
-- Do NOT create new characters unless incidental ones like: cashiers, passers-by, if any, and these should remain without names
-- Create a compelling narrative arc with rising tension, climax, and resolution
-- Develop character arcs that show growth and change
-- Include key plot points, conflicts, and important scenes
-- Balance external plot with internal character development
-- Ensure that each chapter has a clear purpose in advancing the story
+Estimated input/prompt tokens: {estimated_input_tokens} (includes: example outline, concept, characters, and prompt)
+Actual    input/prompt tokens: {prompt_token_count} (via the API response usage)
+Prompt cache: {cache_read_tokens} tokens read, {cache_write_tokens} tokens written
+Setting max_tokens to: {max_tokens} (requested: {args.max_tokens}, calculated safe maximum: {max_safe_tokens})
 
-IMPORTANT FORMATTING INSTRUCTIONS:
-1. DO NOT use Markdown formatting (no #, ##, ###, *, **, etc.)
-2. Start with "OUTLINE:" followed by the novel title on the next line
-3. For parts/sections, use plain text like: "PART I: THE BEGINNING"
-4. For chapters, use ONLY simple numbering like: "1. Chapter Title" (no "Chapter" word, just the number and title)
-5. DO NOT include POV markers like "POV: Character"
-6. For each chapter, include 4-6 bullet points describing key events and developments
-7. Format each bullet point starting with "- " (dash followed by space)
-8. Each bullet point should describe a single key event, character moment, or plot development
-9. Make bullet points substantive but concise, focusing on important elements
-10. Include an optional brief epilogue with bullet points if appropriate for the story
+elapsed time: {minutes} minutes, {seconds:.2f} seconds
+Outline has {outline_word_count} words
+Output is {output_token_count} tokens, thinking plus outline (via the API response usage)
+Outline saved to: {outline_filename}
+###
 """
-
-if args.detailed:
-    prompt += """
-11. For each chapter, include additional bullet points (up to 7-8 total) covering:
-    - Key plot developments
-    - Important character moments or revelations
-    - Setting details
-    - Thematic elements being developed
-12. Keep all bullet points in the same format with "- " at the start of each point
+    
+    if thinking_content:
+        # a version of the prompt without the premise, example outline, characters, concept content
+        prompt_for_logging = PROMPT_REFERENCE_BLOCK_RE.sub('', prompt) + """
+note: The actual prompt included the premise and any example outline, characters, and concept which are not logged here to save space.
 """
-
-# create a version of the prompt without the example outline, characters, concept content:
-prompt_for_logging = f"""You are a skilled novelist and story architect helping to create a detailed novel outline in fluent, authentic {args.lang}.
+        thinking_filename = save_dir / f"outline_thinking_{timestamp}.txt"
+        await asyncio.gather(outline_saved, asyncio.to_thread(write_thinking_file, thinking_filename, [
+            "=== PROMPT USED (EXCLUDING REFERENCE CONTENT) ===\n",
+            prompt_for_logging,
+            "\n\n=== AI'S THINKING PROCESS ===\n\n",
+            thinking_content,
+            "\n=== END AI'S THINKING PROCESS ===\n",
+            stats
+        ]))
+        saved_message = f"AI thinking saved to: {thinking_filename}\n"
+    elif args.no_thinking_log:
+        await outline_saved
+        saved_message = "AI thinking was not saved (--no_thinking_log).\n"
+    else:
+        await outline_saved
+        saved_message = "No AI thinking content was captured.\n"
+    
+    sys.stdout.write(
+        f"Outline saved to: {outline_filename}\n"
+        f"{saved_message}\n"
+        f"Files saved to: {absolute_path}\n"
+        "###\n\n"
+    )
+    sys.stdout.flush()
+
+async def generate_outlines(client, args, prompt_instructions, prompt_references, premise_content):
+    """Generate one outline, or one per run in --batch_config, all sharing the client and the loaded files."""
+    shared = (client, args, prompt_instructions, prompt_references, premise_content)
+    if args.batch_config:
+        # several variations in one process: the input files are read once, the client (and its
+        # connection) is shared, and runs after the first hit the prompt cache for the shared prefix
+        try:
+            with open(args.batch_config, 'r', encoding='utf-8') as file:
+                batch_runs = json.load(file)
+        except Exception as e:
+            print(f"Error: Could not read batch config file: {e}")
+            sys.exit(1)
+        for run_number, run in enumerate(batch_runs, start=1):
+            print(f"\n=== Batch run {run_number} of {len(batch_runs)} ===")
+            await generate_outline(
+                *shared,
+                run.get("title", args.title),
+                run.get("genre", args.genre),
+                run.get("chapters", args.chapters),
+                run.get("sections", args.sections)
+            )
+    else:
+        await generate_outline(*shared, args.title, args.genre, args.chapters, args.sections)
+
+def main(args):
+    """
+    Read the input files, build the prompt and the API client, and generate the outline(s).
+    Everything here runs per call, so importing this module has no side effects.
+    """
+    # refuse oversized input files before reading any of them into memory and the prompt
+    for label, path in (("Premise", args.premise_file), ("Example outline", args.example_outline),
+                        ("Concept", args.concept_file), ("Characters", args.characters_file)):
+        if path and os.path.isfile(path) and os.path.getsize(path) > MAX_INPUT_FILE_BYTES:
+            print(f"Error: {label} file is too large: {path} ({os.path.getsize(path)} bytes, the limit is {MAX_INPUT_FILE_BYTES})")
+            sys.exit(1)
+    
+    # read the premise and the optional example outline, concept, and characters files
+    # at the same time, their open/read latency overlaps instead of adding up
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        (premise_content, premise_error), (example_outline_content, example_error), \
+        (concept_content, concept_error), (characters_content, characters_error) = pool.map(
+            read_input_file,
+            [args.premise_file, args.example_outline, args.concept_file, args.characters_file]
+        )
+    
+    # verify that premise_file exists and was read
+    if isinstance(premise_error, FileNotFoundError):
+        print(f"Error: Premise file not found: {args.premise_file}")
+        print("Please provide a valid premise file.")
+        sys.exit(1)
+    elif premise_error:
+        print(f"Error: Could not read premise file: {premise_error}")
+        sys.exit(1)
+    print(f"Loaded premise from: {args.premise_file}")
+    
+    # make sure the output directory exists before any API time is spent
+    save_dir = Path(args.save_dir)
+    save_dir.mkdir(parents=True, exist_ok=True)
+    
+    # Report on the example outline if provided
+    if args.example_outline:
+        if isinstance(example_error, FileNotFoundError):
+            print(f"Note: Example outline file not found: {args.example_outline}")
+            print("Continuing without example outline.")
+        elif example_error:
+            print(f"Warning: Could not read example outline file: {example_error}")
+            print("Continuing without example outline.")
+        else:
+            print(f"Loaded example outline from: {args.example_outline}")
+    
+    # Report on the concept file if provided
+    if args.concept_file:
+        if isinstance(concept_error, FileNotFoundError):
+            print(f"Note: Concept file not found: {args.concept_file}")
+            print("Continuing with just the premise description.")
+        elif concept_error:
+            print(f"Warning: Could not read concept file: {concept_error}")
+            print("Continuing with just the premise description.")
+        else:
+            print(f"Loaded concept from: {args.concept_file}")
+    
+    # report on the characters file if provided
+    if args.characters_file:
+        if isinstance(characters_error, FileNotFoundError):
+            print(f"Note: Characters file not found: {args.characters_file}")
+            print("Continuing without characters information.")
+        elif characters_error:
+            print(f"Warning: Could not read characters file: {characters_error}")
+            print("Continuing without characters information.")
+        else:
+            print(f"Loaded characters from: {args.characters_file}")
+    
+    # create prompt with explicit instructions for AI, in three parts ordered from least to most likely to change:
+    # the instructions, the reference material (concept, characters, example outline), then the premise and
+    # per-run settings (chapters, sections, title, genre), so a rerun with new settings still hits the cached prefix
+    prompt_instructions = f"""You are a skilled novelist and story architect helping to create a detailed novel outline in fluent, authentic {args.lang}.
 Draw upon your knowledge of worldwide literary traditions, narrative structure, and plot development approaches from across cultures,
 while expressing everything in natural, idiomatic {args.lang} that honors its unique linguistic character.
 
-Create a detailed novel outline with approximately {args.chapters} chapters organized into {args.sections} main parts or sections.
-{title_suggestion}
-{genre_suggestion}
-Your outline should follow the general format and level of detail shown in the example (if provided), while being completely original.
-
 Consider the following in your thinking:
 - Refer to the included CHARACTERS, if provided
-- Follow the structure of the EXAMPLE OUTLINE if provided
+- Follow the structure of the EXAMPLE OUTLINE, if provided, but make proper adjustments for this novel
 - Do NOT create new characters unless incidental ones like: cashiers, passers-by, if any, and these should remain without names
 - Create a compelling narrative arc with rising tension, climax, and resolution
 - Develop character arcs that show growth and change
@@ -247,10 +506,9 @@ IMPORTANT FORMATTING INSTRUCTIONS:
 9. Make bullet points substantive but concise, focusing on important elements
 10. Include an optional brief epilogue with bullet points if appropriate for the story
 """
-
-
-if args.detailed:
-    prompt_for_logging += """
+    
+    if args.detailed:
+        prompt_instructions += """
 11. For each chapter, include additional bullet points (up to 7-8 total) covering:
     - Key plot developments
     - Important character moments or revelations
@@ -258,169 +516,48 @@ if args.detailed:
     - Thematic elements being developed
 12. Keep all bullet points in the same format with "- " at the start of each point
 """
+    
+    prompt_references = f"""
+=== CONCEPT ===
+{concept_content}
+=== END CONCEPT ===
 
-prompt_for_logging += """
-note: The actual prompt included any example outline, characters, and concept which are not logged here to save space.
-"""
-
-# calculate a safe max_tokens value
-# estimate the input tokens based on a rough character count approximation
-estimated_input_tokens = int(len(prompt) // 5.5)
-max_safe_tokens = max(5000, args.context_window - estimated_input_tokens - 1000)  # 1000 token buffer for safety
-# use the minimum of the requested max_tokens and what we calculated as safe:
-max_tokens = int(min(args.max_tokens, max_safe_tokens))
-
-absolute_path = os.path.abspath(args.save_dir)
-
-print(f"Max request timeout: {args.request_timeout} seconds")
-print(f"Max retries: 0 (anthropic's default was 2)")
-print(f"Max AI model context window: {args.context_window} tokens")
-print(f"AI model thinking budget: {args.thinking_budget} tokens")
-print(f"Max output tokens: {args.max_tokens} tokens")
-print(f"Setting max_tokens to: {max_tokens} (requested: {args.max_tokens}, calculated safe maximum: {max_safe_tokens})")
-
-# ensure max_tokens is always greater than thinking budget
-if max_tokens <= args.thinking_budget:
-    max_tokens = args.thinking_budget + args.max_tokens
-    print(f"Adjusted max_tokens to {max_tokens} to exceed thinking budget of {args.thinking_budget} (room for thinking/writing)")
-
-print(f"Estimated input/prompt tokens: {estimated_input_tokens}")
-
-client = anthropic.Anthropic(
-    timeout=args.request_timeout,
-    max_retries=0 # default is 2
-)
-
-prompt_token_count = 0
-try:
-    response = client.beta.messages.count_tokens(
-        model="claude-3-7-sonnet-20250219",
-        messages=[{"role": "user", "content": prompt}],
-        thinking={
-            "type": "enabled",
-            "budget_tokens": args.thinking_budget
-        },
-        betas=["output-128k-2025-02-19"]
-    )
-    prompt_token_count = response.input_tokens
-    print(f"Actual input/prompt tokens: {prompt_token_count} (via free client.beta.messages.count_tokens)")
-except Exception as e:
-    print(f"Error:\n{e}\n")
-
-full_response = ""
-thinking_content = ""
-
-start_time = time.time()
-
-dt = datetime.fromtimestamp(start_time)
-formatted_time = dt.strftime("%A %B %d, %Y %I:%M:%S %p").replace(" 0", " ").lower()
-print(f"****************************************************************************")
-print(f"*  sending to API at: {formatted_time}")
-print(f"*  ... standby, as this usually takes a few minutes")
-print(f"*  ")
-print(f"*  It's recommended to keep the Terminal or command line the sole 'focus'")
-print(f"*  and to avoid browsing online or running other apps, as these API")
-print(f"*  network connections are often flakey, like delicate echoes of whispers.")
-print(f"*  ")
-print(f"*  So breathe, remove eye glasses, stretch, relax, and be like water 🥋 🧘🏽‍♀️")
-print(f"****************************************************************************")
-
-try:
-    with client.beta.messages.stream(
-        model="claude-3-7-sonnet-20250219",
-        max_tokens=max_tokens,
-        messages=[{"role": "user", "content": prompt}],
-        thinking={
-            "type": "enabled",
-            "budget_tokens": args.thinking_budget
-        },
-        betas=["output-128k-2025-02-19"]
-    ) as stream:
-        # track both thinking and text output
-        for event in stream:
-            if event.type == "content_block_delta":
-                if event.delta.type == "thinking_delta":
-                    thinking_content += event.delta.thinking
-                elif event.delta.type == "text_delta":
-                    full_response += event.delta.text
-except Exception as e:
-    print(f"Error:\n{e}\n")
-
-elapsed = time.time() - start_time
-minutes = int(elapsed // 60)
-seconds = elapsed % 60
-
-# Remove markdown from the response
-cleaned_response = remove_markdown_format(full_response)
-timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-outline_filename = f"{args.save_dir}/outline_{timestamp}.txt"
-with open(outline_filename, 'w', encoding='utf-8') as file:
-    file.write(cleaned_response)
-
-outline_word_count = count_words(cleaned_response)
-
-print(f"\nelapsed time: {minutes} minutes, {seconds:.2f} seconds.")
-print(f"\nOutline has {outline_word_count} words.")
-
-outline_token_count = 0
-try:
-    response = client.beta.messages.count_tokens(
-        model="claude-3-7-sonnet-20250219",
-        messages=[{"role": "user", "content": cleaned_response}],
-        thinking={
-            "type": "enabled",
-            "budget_tokens": args.thinking_budget
-        },
-        betas=["output-128k-2025-02-19"]
-    )
-    outline_token_count = response.input_tokens
-    print(f"Outline text is {outline_token_count} tokens (via free client.beta.messages.count_tokens)")
-except Exception as e:
-    print(f"Error:\n{e}\n")
-
-stats = f"""
-Details:
-Max request timeout: {args.request_timeout} seconds
-Max retries: 0 (anthropic's default was 2)
-Max AI model context window: {args.context_window} tokens
-AI model thinking budget: {args.thinking_budget} tokens
-Max output tokens: {args.max_tokens} tokens
-
-Estimated input/prompt tokens: {estimated_input_tokens} (includes: example outline, concept, characters, and prompt)
-Actual    input/prompt tokens: {prompt_token_count} (via free client.beta.messages.count_tokens)
-Setting max_tokens to: {max_tokens} (requested: {args.max_tokens}, calculated safe maximum: {max_safe_tokens})
+=== CHARACTERS ===
+{characters_content}
+=== END CHARACTERS ===
 
-elapsed time: {minutes} minutes, {seconds:.2f} seconds
-Outline has {outline_word_count} words
-Outline text is {outline_token_count} tokens (via free client.beta.messages.count_tokens)
-Outline saved to: {outline_filename}
-###
+=== EXAMPLE OUTLINE FORMAT ===
+{example_outline_content}
+=== END EXAMPLE OUTLINE FORMAT ===
 """
+    
+    # imported here rather than at the top, so --help and bad input files don't pay for loading the SDK
+    import anthropic
+    import httpx
+    
+    try:
+        import h2  # noqa: F401  httpx only speaks HTTP/2 when the h2 package is installed
+        http2_available = True
+    except ImportError:
+        http2_available = False
+    
+    # the async client lets Ctrl-C cancel the stream cleanly (the task is cancelled and the
+    # async with closes the connection) and lets the file writes overlap once the stream ends
+    client = anthropic.AsyncAnthropic(
+        # keep the connection alive between batch runs, over HTTP/2 when h2 is installed
+        http_client=anthropic.DefaultAsyncHttpxClient(
+            http2=http2_available,
+            limits=httpx.Limits(max_keepalive_connections=4, keepalive_expiry=60.0),
+        ),
+        timeout=args.request_timeout,
+        max_retries=0 # default is 2
+    )
+    
+    try:
+        asyncio.run(generate_outlines(client, args, prompt_instructions, prompt_references, premise_content))
+    except KeyboardInterrupt:
+        print("\nCancelled, the partial outline (if any) was kept in the .raw file.")
+        sys.exit(130)
 
-if thinking_content:
-    thinking_filename = f"{args.save_dir}/outline_thinking_{timestamp}.txt"
-    with open(thinking_filename, 'w', encoding='utf-8') as file:
-        file.write("=== PROMPT USED (EXCLUDING REFERENCE CONTENT) ===\n")
-        file.write(prompt_for_logging)
-        file.write("\n\n=== AI'S THINKING PROCESS ===\n\n")
-        file.write(thinking_content)
-        file.write("\n=== END AI'S THINKING PROCESS ===\n")
-        file.write(stats)
-    print(f"Outline saved to: {outline_filename}")
-    print(f"AI thinking saved to: {thinking_filename}\n")
-    print(f"Files saved to: {absolute_path}")
-else:
-    print(f"Outline saved to: {outline_filename}")
-    print("No AI thinking content was captured.\n")
-    print(f"Files saved to: {absolute_path}")
-
-print(f"###\n")
-
-# empty garbage, helpful? nah, python's garbage collection is mobbed-up:
-example_outline_content = None
-characters_content = None
-concept_content = None
-full_response = None
-thinking_content = None
-cleaned_response = None
-client = None
+if __name__ == '__main__':
+    main(parser.parse_args())
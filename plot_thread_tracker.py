@@ -6,20 +6,44 @@
 #              narrative. Uses textual representation rather than graphics.
 #
 # Usage: 
-# python -B plot_thread_tracker.py --manuscript_file manuscript.txt [--outline_file outline.txt] [--analysis_depth basic|detailed|comprehensive]
+# python -B plot_thread_tracker.py --manuscript_file manuscript.txt [--outline_file outline.txt] [--analysis_depth basic|detailed|comprehensive ...]
 
-import pypandoc
 import anthropic
 
 import os
 import argparse
+import asyncio
+import hashlib
+import json
+import random
 import re
 import sys
 import time
 from datetime import datetime
-
-
-def parse_arguments():
+from functools import lru_cache
+
+MODEL = "claude-3-7-sonnet-20250219"
+SYSTEM_PROMPT = "NO Markdown! Never respond with Markdown formatting, plain text only."
+RAW_WRITE_BUFFER = 64 * 1024  # bytes of streamed report text gathered per write to the .raw spool
+
+# the markdown that can slip through despite the system prompt, and what each is replaced with,
+# applied in this order by strip_markdown (bullets before italics, so "* item" isn't read as emphasis)
+MARKDOWN_PATTERNS = [
+    (re.compile(r'^```.*\n?', re.MULTILINE), ''),                 # code fence lines
+    (re.compile(r'^#{1,6}\s+', re.MULTILINE), ''),                # headers
+    (re.compile(r'^>\s?', re.MULTILINE), ''),                     # block quotes
+    (re.compile(r'^([ \t]*)[*+][ \t]+', re.MULTILINE), r'\1- '),  # bullets
+    (re.compile(r'\*\*(.+?)\*\*'), r'\1'),                        # bold
+    (re.compile(r'(?<!\w)__(.+?)__(?!\w)'), r'\1'),               # bold, but not inside snake_case words
+    (re.compile(r'\*([^*\n]+)\*'), r'\1'),                        # italic
+    (re.compile(r'`([^`\n]+)`'), r'\1'),                          # inline code
+    (re.compile(r'\[([^\]]+)\]\([^)]+\)'), r'\1'),                 # links, keeping the link text
+]
+
+
+@lru_cache(maxsize=1)
+def create_parser():
+    """Build the argument parser once, later calls (from a wrapper that runs this in a loop) reuse it."""
     parser = argparse.ArgumentParser(
         description='Analyze manuscript for plot threads and their interconnections using Claude thinking API.',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -28,6 +52,7 @@ Example usages:
   python -B plot_thread_tracker.py --manuscript_file manuscript.txt --analysis_depth comprehensive
   python -B plot_thread_tracker.py --manuscript_file manuscript.txt --outline_file outline.txt --analysis_depth basic
   python -B plot_thread_tracker.py --manuscript_file manuscript.txt --analysis_depth detailed --save_dir reports
+  python -B plot_thread_tracker.py --manuscript_file manuscript.txt --analysis_depth basic detailed comprehensive
         """
     )
 
@@ -44,9 +69,9 @@ Example usages:
                            help="File containing the story outline (optional)")
 
     # Add arguments to the Analysis Options group
-    analysis_group.add_argument('--analysis_depth', type=str, default="comprehensive",
+    analysis_group.add_argument('--analysis_depth', type=str, nargs='+', default=["comprehensive"],
                             choices=["basic", "detailed", "comprehensive"],
-                            help="Depth of plot thread analysis to perform (default: comprehensive)")
+                            help="One or more depths of plot thread analysis to perform, several depths run concurrently (default: comprehensive)")
     analysis_group.add_argument('--analysis_description', type=str, default="",
                             help="Optional description to include in output filenames")
     analysis_group.add_argument('--thread_focus', type=str, nargs='+', default=None,
@@ -59,6 +84,10 @@ Example usages:
     api_group.add_argument('--desired_output_tokens',  type=int, default=8000, help='User desired number of tokens to generate before stopping output')
     api_group.add_argument('--request_timeout', type=int, default=300,
                          help='Maximum timeout for each *streamed chunk* of output (default: 300 seconds)')
+    api_group.add_argument('--stall_timeout', type=int, default=60,
+                         help='Cancel the stream when nothing arrives for this many seconds (default: 60 seconds)')
+    api_group.add_argument('--max_retries', type=int, default=4,
+                         help='Maximum times to retry a request after a transient error, and to restart a stream that fails part way, may get expensive if too many (default: 4)')
 
     # Add arguments to the Output Configuration group
     output_group.add_argument('--save_dir', type=str, default=".",
@@ -67,8 +96,18 @@ Example usages:
                             help='Skip saving the AI thinking process (smaller output files)')
     output_group.add_argument('--ascii_art', action='store_true',
                             help='Include simple ASCII art visualization in the output')
+    output_group.add_argument('--use_pandoc', action='store_true',
+                            help='Strip Markdown from the output with pandoc instead of the built-in patterns (needs pypandoc and pandoc)')
+    output_group.add_argument('--cache_dir', type=str, default=None,
+                            help='Directory for cached analysis results (default: SAVE_DIR/.cache)')
+    output_group.add_argument('--no_cache', action='store_true',
+                            help='Always call the API, without reading or writing cached analysis results')
 
-    return parser.parse_args()
+    return parser
+
+
+def parse_arguments():
+    return create_parser().parse_args()
 
 
 def read_file(file_path, file_type):
@@ -96,46 +135,31 @@ def read_file(file_path, file_type):
 
 
 def count_words(text):
-    return len(re.sub(r'(\r\n|\r|\n)', ' ', text).split())
-
-
-def strip_markdown(md_text):
-    try:
-        plain_text = pypandoc.convert_text(md_text, 'plain', format='markdown')
-        plain_text = plain_text.replace("\u00A0", " ")
-        return plain_text
-    except Exception as e:
-        print(f"Error converting markdown to plain text: {e}")
-        print("Make sure pypandoc and pandoc are properly installed.")
-        return md_text  # return original text if conversion fails
-
-
-def create_prompt(analysis_depth, outline_content, manuscript_content, thread_focus=None, use_ascii=False):
-    no_markdown = "IMPORTANT: - NO Markdown formatting"
+    return len(text.split())
+
+
+def strip_markdown(md_text, use_pandoc=False):
+    if use_pandoc:
+        # the full pandoc conversion, which also rewraps the text, runs the pandoc binary each time
+        try:
+            import pypandoc
+            plain_text = pypandoc.convert_text(md_text, 'plain', format='markdown')
+            plain_text = plain_text.replace("\u00A0", " ")
+            return plain_text
+        except Exception as e:
+            print(f"Error converting markdown to plain text: {e}")
+            print("Make sure pypandoc and pandoc are properly installed.")
+            return md_text  # return original text if conversion fails
     
-    thread_focus_str = ""
-    if thread_focus:
-        thread_focus_str = f"Pay special attention to these specific plot threads: {', '.join(thread_focus)}."
-    
-    ascii_instruction = ""
-    if use_ascii:
-        ascii_instruction = """
-Include simple ASCII art visualizations to represent:
-- Thread progressions using horizontal timelines (e.g., Thread A: ----*----*------>)
-- Thread connections using branching symbols (e.g., +-- for connections)
-- Thread intensity using symbols like | (low), || (medium), ||| (high)
-"""
-    
-    prompts = {
-        "basic": f"""=== OUTLINE ===
-{outline_content}
-=== END OUTLINE ===
+    plain_text = md_text
+    for pattern, replacement in MARKDOWN_PATTERNS:
+        plain_text = pattern.sub(replacement, plain_text)
+    return plain_text
 
-=== MANUSCRIPT ===
-{manuscript_content}
-=== END MANUSCRIPT ===
 
-{no_markdown}
+# the instructions for each analysis depth, {no_markdown}, {thread_focus_str} and {ascii_instruction}
+# are filled in by create_prompt
+BASIC_PROMPT = """{no_markdown}
 
 You are an expert fiction editor specializing in narrative structure and plot analysis. Conduct a BASIC plot thread analysis of the manuscript, focusing on the main storylines and how they progress. {thread_focus_str}
 
@@ -164,17 +188,9 @@ Organize your analysis by thread, showing each thread's progression and key conn
 - Major connections to other threads
 
 Present the information in a clear, structured format that makes the plot architecture easy to understand without requiring graphics.
-""",
-
-        "detailed": f"""=== OUTLINE ===
-{outline_content}
-=== END OUTLINE ===
-
-=== MANUSCRIPT ===
-{manuscript_content}
-=== END MANUSCRIPT ===
+"""
 
-{no_markdown}
+DETAILED_PROMPT = """{no_markdown}
 
 You are an expert fiction editor specializing in narrative structure and plot analysis. Conduct a DETAILED plot thread analysis of the manuscript, tracking how multiple storylines develop and interconnect. {thread_focus_str}
 
@@ -218,17 +234,9 @@ For each thread entry, include:
 - Assessment of thread effectiveness
 
 Use text formatting to create a clear visual structure that shows the relationships between threads without requiring graphics.
-""",
-
-        "comprehensive": f"""=== OUTLINE ===
-{outline_content}
-=== END OUTLINE ===
-
-=== MANUSCRIPT ===
-{manuscript_content}
-=== END MANUSCRIPT ===
+"""
 
-{no_markdown}
+COMPREHENSIVE_PROMPT = """{no_markdown}
 
 You are an expert fiction editor specializing in narrative structure and plot architecture. Conduct a COMPREHENSIVE plot thread analysis of the manuscript, creating a detailed visualization of how all narrative elements interconnect. {thread_focus_str}
 
@@ -275,25 +283,125 @@ For the Interconnection Atlas, create a text-based visualization that shows:
 
 Use precise manuscript locations (with exact quotes) to anchor your analysis throughout.
 """
-    }
-    
-    return prompts.get(analysis_depth, "")
 
+PROMPT_TEMPLATES = {
+    "basic": BASIC_PROMPT,
+    "detailed": DETAILED_PROMPT,
+    "comprehensive": COMPREHENSIVE_PROMPT
+}
 
-def run_plot_thread_analysis(analysis_depth, outline_content, manuscript_content, args):
-    """Run a plot thread analysis and return results."""
-    prompt = create_prompt(analysis_depth, outline_content, manuscript_content, args.thread_focus, args.ascii_art)
 
-    client = anthropic.Anthropic(
-        timeout=args.request_timeout,
-        max_retries=0
+def create_prompt(analysis_depth, outline_content, manuscript_content, thread_focus=None, use_ascii=False):
+    no_markdown = "IMPORTANT: - NO Markdown formatting"
+    
+    thread_focus_str = ""
+    if thread_focus:
+        thread_focus_str = f"Pay special attention to these specific plot threads: {', '.join(thread_focus)}."
+    
+    ascii_instruction = ""
+    if use_ascii:
+        ascii_instruction = """
+Include simple ASCII art visualizations to represent:
+- Thread progressions using horizontal timelines (e.g., Thread A: ----*----*------>)
+- Thread connections using branching symbols (e.g., +-- for connections)
+- Thread intensity using symbols like | (low), || (medium), ||| (high)
+"""
+    
+    # the outline and manuscript come first and are sent as their own (cached) block, only the
+    # instructions that follow them depend on the analysis depth
+    manuscript_block = f"""=== OUTLINE ===
+{outline_content}
+=== END OUTLINE ===
+
+=== MANUSCRIPT ===
+{manuscript_content}
+=== END MANUSCRIPT ===
+
+"""
+    
+    # only the chosen depth's instructions are filled in, the other two templates are left alone
+    instructions = PROMPT_TEMPLATES.get(analysis_depth, "").format(
+        no_markdown=no_markdown,
+        thread_focus_str=thread_focus_str,
+        ascii_instruction=ascii_instruction
     )
     
+    return manuscript_block, instructions
+
+
+def load_cached_analysis(cache_filename):
+    """Return the cached (response, thinking, prompt tokens, report tokens), or None if there isn't one."""
+    try:
+        with open(cache_filename, 'r', encoding='utf-8') as file:
+            cached = json.load(file)
+        return cached["response"], cached["thinking"], cached["prompt_tokens"], cached["report_tokens"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def save_cached_analysis(cache_filename, response, thinking, prompt_tokens, report_tokens):
+    """Write an analysis result to the cache, via a temporary file so a partial entry is never left behind."""
+    try:
+        os.makedirs(os.path.dirname(cache_filename), exist_ok=True)
+        temp_filename = f"{cache_filename}.tmp"
+        with open(temp_filename, 'w', encoding='utf-8') as file:
+            json.dump({
+                "response": response,
+                "thinking": thinking,
+                "prompt_tokens": prompt_tokens,
+                "report_tokens": report_tokens
+            }, file)
+        os.replace(temp_filename, cache_filename)
+    except OSError as e:
+        print(f"Warning: could not cache the analysis: {e}")
+
+
+def is_transient_error(e):
+    """True for the API errors worth retrying: dropped connections, timeouts, rate limits, overloads and server errors."""
+    if isinstance(e, anthropic.APIConnectionError):
+        return True
+    if isinstance(e, anthropic.APIStatusError):
+        # an error event part way through a stream arrives on a 200 response, so only the
+        # request's own 4xx mistakes (other than timeout, conflict and rate limit) are final
+        return e.status_code in (408, 409, 429) or not 400 <= e.status_code < 500
+    return False
+
+
+async def run_plot_thread_analysis(client, analysis_depth, outline_content, manuscript_content, args):
+    """Run a plot thread analysis and return results."""
+    manuscript_block, instructions = create_prompt(analysis_depth, outline_content, manuscript_content, args.thread_focus, args.ascii_art)
+    # the outline and manuscript block ends with a cache breakpoint, so another run on the same
+    # manuscript within a few minutes (say, at a different depth) reads it from the prompt cache
+    messages = [{
+        "role": "user",
+        "content": [
+            {"type": "text", "text": manuscript_block, "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": instructions}
+        ]
+    }]
+
+    # the same prompt with the same token settings was already analyzed, reuse that result
+    # instead of streaming it all again (the key covers everything that goes into the request,
+    # plus use_pandoc since the cached text is already stripped of Markdown)
+    cache_filename = None
+    if not args.no_cache:
+        cache_key = hashlib.sha256("\n".join([
+            MODEL, SYSTEM_PROMPT, manuscript_block, instructions,
+            str(args.context_window), str(args.betas_max_tokens),
+            str(args.thinking_budget_tokens), str(args.desired_output_tokens),
+            str(args.use_pandoc)
+        ]).encode('utf-8')).hexdigest()
+        cache_filename = os.path.join(args.cache_dir or os.path.join(args.save_dir, ".cache"), f"{cache_key}.json")
+        cached = load_cached_analysis(cache_filename)
+        if cached:
+            print(f"Using the cached {analysis_depth} plot thread analysis from: {cache_filename}")
+            return cached
+
     prompt_token_count = 0
     try:
-        response = client.beta.messages.count_tokens(
-            model="claude-3-7-sonnet-20250219",
-            messages=[{"role": "user", "content": prompt}],
+        response = await client.beta.messages.count_tokens(
+            model=MODEL,
+            messages=messages,
             thinking={
                 "type": "enabled",
                 "budget_tokens": args.thinking_budget_tokens
@@ -301,7 +409,7 @@ def run_plot_thread_analysis(analysis_depth, outline_content, manuscript_content
             betas=["output-128k-2025-02-19"]
         )
         prompt_token_count = response.input_tokens
-        print(f"Actual input/prompt tokens: {prompt_token_count}")
+        print(f"Actual input/prompt tokens ({analysis_depth}): {prompt_token_count}")
     except Exception as e:
         print(f"Token counting error: {e}")
 
@@ -316,78 +424,131 @@ def run_plot_thread_analysis(analysis_depth, outline_content, manuscript_content
         print(f"Warning: thinking budget is larger than 32K, set to 32K. Use batch for larger thinking budgets.")
         thinking_budget = 32000
 
-    print(f"Running {analysis_depth} plot thread analysis...")
-    print(f"\nToken stats:")
-    print(f"Max AI model context window: [{args.context_window}] tokens")
-    print(f"Input prompt tokens: [{prompt_tokens}] ...")
-    print(f"                     = outline.txt + manuscript.txt")
-    print(f"                       + prompt instructions")
-    print(f"Available tokens: [{available_tokens}]  = {args.context_window} - {prompt_tokens} = context_window - prompt")
-    print(f"Desired output tokens: [{args.desired_output_tokens}]")
-    print(f"AI model thinking budget: [{thinking_budget}] tokens  = {max_tokens} - {args.desired_output_tokens}")
-    print(f"Max output tokens (max_tokens): [{max_tokens}] tokens  = min({thinking_budget}, {available_tokens})")
-    print(f"                                = can not exceed: 'betas=[\"output-128k-2025-02-19\"]'")
+    # one write for the whole block, so it isn't broken up by another depth's output
+    sys.stdout.write("\n".join([
+        f"Running {analysis_depth} plot thread analysis...",
+        f"\nToken stats:",
+        f"Max AI model context window: [{args.context_window}] tokens",
+        f"Input prompt tokens: [{prompt_tokens}] ...",
+        f"                     = outline.txt + manuscript.txt",
+        f"                       + prompt instructions",
+        f"Available tokens: [{available_tokens}]  = {args.context_window} - {prompt_tokens} = context_window - prompt",
+        f"Desired output tokens: [{args.desired_output_tokens}]",
+        f"AI model thinking budget: [{thinking_budget}] tokens  = {max_tokens} - {args.desired_output_tokens}",
+        f"Max output tokens (max_tokens): [{max_tokens}] tokens  = min({thinking_budget}, {available_tokens})",
+        f"                                = can not exceed: 'betas=[\"output-128k-2025-02-19\"]'"
+    ]) + "\n")
+    sys.stdout.flush()
     if thinking_budget < args.thinking_budget_tokens:
-        print(f"Error: prompt is too large to have a {args.thinking_budget_tokens} thinking budget!")
-        sys.exit(1)
-    
-    full_response = ""
-    thinking_content = ""
+        # only this depth is given up on, exiting here would cancel the other depths' streams
+        print(f"Error: the {analysis_depth} prompt is too large to have a {args.thinking_budget_tokens} thinking budget!")
+        return "", "", 0, 0
     
-    system_prompt = "NO Markdown! Never respond with Markdown formatting, plain text only."
+    # the report text goes straight to a .raw file as it streams in rather than being held in
+    # memory, so a stream that fails or stalls part way still leaves what arrived on disk
+    os.makedirs(args.save_dir, exist_ok=True)
+    raw_filename = f"{args.save_dir}/plot_thread_analysis_{analysis_depth}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.raw"
+    thinking_parts = []
+    next_dot_at = time.monotonic() + 1.0  # progress dots go out once a second while text arrives
+    report_token_count = 0
     
     start_time = time.time()
     print(f"Sending request to Claude API...")
     
-    try:
-        with client.beta.messages.stream(
-            model="claude-3-7-sonnet-20250219",
-            system=system_prompt,
-            max_tokens=max_tokens,
-            messages=[{"role": "user", "content": prompt}],
-            thinking={
-                "type": "enabled",
-                "budget_tokens": thinking_budget
-            },
-            betas=["output-128k-2025-02-19"]
-        ) as stream:
-            for event in stream:
-                if event.type == "content_block_delta":
-                    if event.delta.type == "thinking_delta":
-                        thinking_content += event.delta.thinking
-                    elif event.delta.type == "text_delta":
-                        full_response += event.delta.text
-                        # Print progress indicator
-                        if len(full_response) % 1000 == 0:
-                            print(".", end="", flush=True)
-    except Exception as e:
-        print(f"\nAPI Error: {e}")
+    # dead-man switch: every event (including the API's pings) resets the clock, and a stream
+    # that goes quiet for --stall_timeout seconds is closed instead of hanging on a dead connection
+    stalled = False
+    
+    async def close_stalled_stream(stream):
+        nonlocal stalled
+        while True:
+            await asyncio.sleep(5)
+            if time.monotonic() - last_event_time > args.stall_timeout:
+                stalled = True
+                await stream.close()
+                return
+    
+    # the client's own retries only cover starting the stream, a transient failure part way
+    # through is retried here, from the start, after an exponential backoff with jitter
+    # (a failure to start it was already retried by the client, so it is final here)
+    for attempt in range(1, args.max_retries + 2):
+        last_event_time = time.monotonic()
+        stream_started = False
+        try:
+            # the deltas are only a few characters each, a 64KB buffer gathers them into large writes
+            # (and anything still buffered is flushed when the file closes, on error or stall too)
+            with open(raw_filename, 'w', encoding='utf-8', buffering=RAW_WRITE_BUFFER) as raw_file:
+                async with client.beta.messages.stream(
+                    model=MODEL,
+                    system=SYSTEM_PROMPT,
+                    max_tokens=max_tokens,
+                    messages=messages,
+                    thinking={
+                        "type": "enabled",
+                        "budget_tokens": thinking_budget
+                    },
+                    betas=["output-128k-2025-02-19"]
+                ) as stream:
+                    stream_started = True
+                    watchdog = asyncio.create_task(close_stalled_stream(stream))
+                    try:
+                        async for event in stream:
+                            last_event_time = time.monotonic()
+                            if event.type == "content_block_delta":
+                                if event.delta.type == "thinking_delta":
+                                    thinking_parts.append(event.delta.thinking)
+                                elif event.delta.type == "text_delta":
+                                    raw_file.write(event.delta.text)
+                                    # Print progress indicator, paced by the clock since deltas
+                                    # come in uneven sizes and a length check rarely lands on a multiple
+                                    if last_event_time >= next_dot_at:
+                                        print(".", end="", flush=True)
+                                        next_dot_at = last_event_time + 1.0
+                    finally:
+                        watchdog.cancel()
+                    if not stalled:
+                        # the final message reports the output tokens, no count_tokens round-trip needed
+                        usage = (await stream.get_final_message()).usage
+                        report_token_count = usage.output_tokens
+                        print(f"\nPrompt cache: {usage.cache_read_input_tokens or 0} tokens read, {usage.cache_creation_input_tokens or 0} tokens written")
+            break
+        except Exception as e:
+            # closing a stalled stream can surface as a read error, that case is reported below
+            if stalled:
+                break
+            if stream_started and attempt <= args.max_retries and is_transient_error(e):
+                delay = min(30, 2 ** attempt + random.random())
+                print(f"\nAPI Error ({analysis_depth}): {e}")
+                print(f"Retrying the {analysis_depth} analysis in {delay:.1f} seconds (retry {attempt} of {args.max_retries})...")
+                thinking_parts.clear()
+                await asyncio.sleep(delay)
+                continue
+            print(f"\nAPI Error ({analysis_depth}): {e}")
+            print(f"The partial report (if any) was kept in: {raw_filename}")
+            return "", "", 0, 0
+    
+    if stalled:
+        print(f"\nAPI Error ({analysis_depth}): nothing received for {args.stall_timeout} seconds, the stream was cancelled")
+        print(f"The partial report (if any) was kept in: {raw_filename}")
         return "", "", 0, 0
     
+    with open(raw_filename, 'r', encoding='utf-8') as raw_file:
+        full_response = raw_file.read()
+    # the complete report is back in memory and is saved from here on, the raw spool isn't needed
+    os.remove(raw_filename)
+    thinking_content = "".join(thinking_parts)
+    
     elapsed = time.time() - start_time
     minutes = int(elapsed // 60)
     seconds = elapsed % 60
     
     report_word_count = count_words(full_response)
-    print(f"\nCompleted in {minutes}m {seconds:.2f}s. Report has {report_word_count} words.")
+    print(f"\nCompleted the {analysis_depth} analysis in {minutes}m {seconds:.2f}s. Report has {report_word_count} words.")
     
-    # Get token count for response
-    report_token_count = 0
-    try:
-        response = client.beta.messages.count_tokens(
-            model="claude-3-7-sonnet-20250219",
-            messages=[{"role": "user", "content": full_response}],
-            thinking={
-                "type": "enabled",
-                "budget_tokens": thinking_budget
-            },
-            betas=["output-128k-2025-02-19"]
-        )
-        report_token_count = response.input_tokens
-    except Exception as e:
-        print(f"Response token counting error: {e}")
+    plain_text_response = strip_markdown(full_response, args.use_pandoc)
     
-    plain_text_response = strip_markdown(full_response)
+    if cache_filename and plain_text_response:
+        save_cached_analysis(cache_filename, plain_text_response, thinking_content, prompt_token_count, report_token_count)
     
     return plain_text_response, thinking_content, prompt_token_count, report_token_count
 
@@ -414,7 +575,7 @@ def save_report(analysis_depth, full_response, thinking_content, prompt_token_co
             file.write("=== PLOT THREAD ANALYSIS DEPTH ===\n")
             file.write(f"{analysis_depth}\n\n")
             file.write("=== AI'S THINKING PROCESS ===\n\n")
-            file.write(strip_markdown(thinking_content)) # Remove Markdown
+            file.write(strip_markdown(thinking_content, args.use_pandoc)) # Remove Markdown
             file.write("\n=== END AI'S THINKING PROCESS ===\n")
             file.write(stats)
         print(f"AI thinking saved to: {thinking_filename}")
@@ -423,48 +584,85 @@ def save_report(analysis_depth, full_response, thinking_content, prompt_token_co
     return report_filename
 
 
-def main():
-    args = parse_arguments()
-    
-    manuscript_content = read_file(args.manuscript_file, "manuscript")
-    outline_content = read_file(args.outline_file, "outline") if args.outline_file else ""
-    
-    thread_focus_str = ", ".join(args.thread_focus) if args.thread_focus else "All threads"
-    
-    current_time = datetime.now().strftime("%I:%M:%S %p").lower().lstrip("0")
-    print("\n=== Plot Thread Tracker Configuration ===")
-    print(f"Analysis depth: {args.analysis_depth}")
-    print(f"Thread focus: {thread_focus_str}")
-    print(f"ASCII art: {'Enabled' if args.ascii_art else 'Disabled'}")
-    print(f"Max request timeout: {args.request_timeout} seconds")
-    print(f"Save directory: {os.path.abspath(args.save_dir)}")
-    print(f"Started at: {current_time}")
-    print("=" * 40 + "\n")
-    
-    full_response, thinking_content, prompt_token_count, report_token_count = run_plot_thread_analysis(
-        args.analysis_depth, outline_content, manuscript_content, args
-    )
-    
+def report_for_depth(analysis_depth, result, thread_focus_str, manuscript_word_count, args):
+    """Save the report for one analysis depth, along with its run details."""
+    full_response, thinking_content, prompt_token_count, report_token_count = result
     if full_response:
         stats = f"""
 Details:
-Analysis depth: {args.analysis_depth} plot thread analysis
+Analysis depth: {analysis_depth} plot thread analysis
+Manuscript: {manuscript_word_count} words
 Thread focus: {thread_focus_str}
 ASCII art: {'Enabled' if args.ascii_art else 'Disabled'}
 Max request timeout: {args.request_timeout} seconds
+Max retries: {args.max_retries}
 Max AI model context window: {args.context_window} tokens
 AI model thinking budget: {args.thinking_budget_tokens} tokens
 Max output tokens: {args.betas_max_tokens} tokens
 
 Input tokens: {prompt_token_count}
-Output tokens: {report_token_count}
+Output tokens: {report_token_count} (thinking plus report, via the API response usage)
 """
         
-        save_report(args.analysis_depth, full_response, thinking_content, 
+        save_report(analysis_depth, full_response, thinking_content, 
                   prompt_token_count, report_token_count, args, stats)
     else:
-        print("Failed to complete plot thread analysis.")
+        print(f"Failed to complete {analysis_depth} plot thread analysis.")
+
+
+async def main():
+    args = parse_arguments()
+    
+    # read the manuscript and outline at the same time, in worker threads
+    if args.outline_file:
+        manuscript_content, outline_content = await asyncio.gather(
+            asyncio.to_thread(read_file, args.manuscript_file, "manuscript"),
+            asyncio.to_thread(read_file, args.outline_file, "outline")
+        )
+    else:
+        manuscript_content = await asyncio.to_thread(read_file, args.manuscript_file, "manuscript")
+        outline_content = ""
+    
+    thread_focus_str = ", ".join(args.thread_focus) if args.thread_focus else "All threads"
+    # counted once here and handed to every depth's details, the manuscript doesn't change between them
+    manuscript_word_count = count_words(manuscript_content)
+    # a depth given twice would only repeat the same request
+    analysis_depths = list(dict.fromkeys(args.analysis_depth))
+    
+    current_time = datetime.now().strftime("%I:%M:%S %p").lower().lstrip("0")
+    sys.stdout.write("\n".join([
+        "\n=== Plot Thread Tracker Configuration ===",
+        f"Analysis depth: {', '.join(analysis_depths)}",
+        f"Manuscript: {manuscript_word_count} words",
+        f"Thread focus: {thread_focus_str}",
+        f"ASCII art: {'Enabled' if args.ascii_art else 'Disabled'}",
+        f"Max request timeout: {args.request_timeout} seconds",
+        f"Max retries: {args.max_retries}",
+        f"Save directory: {os.path.abspath(args.save_dir)}",
+        f"Started at: {current_time}",
+        "=" * 40 + "\n"
+    ]) + "\n")
+    sys.stdout.flush()
+    
+    # one client for every depth, so the concurrent streams share its connection pool
+    client = anthropic.AsyncAnthropic(
+        timeout=args.request_timeout,
+        max_retries=args.max_retries
+    )
+    
+    # each depth is an independent streaming request, run them side by side rather than one
+    # after another so the wall-clock is that of the slowest depth instead of their sum
+    results = await asyncio.gather(*[
+        run_plot_thread_analysis(client, analysis_depth, outline_content, manuscript_content, args)
+        for analysis_depth in analysis_depths
+    ], return_exceptions=True)
+    
+    for analysis_depth, result in zip(analysis_depths, results):
+        if isinstance(result, Exception):
+            print(f"Failed to complete {analysis_depth} plot thread analysis: {result}")
+            continue
+        report_for_depth(analysis_depth, result, thread_focus_str, manuscript_word_count, args)
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -1,5 +1,28 @@
 import re
 
+# Forbidden punctuation sequences and their replacements, applied in this order
+# (a replacement can create a sequence that a later one then cleans up). They are
+# all plain strings, so str.replace handles them without going through the regex engine.
+PUNCTUATION_REPLACEMENTS = [
+    ('-,', ','),              # Replace -, with just a comma
+    # ('... ', ' '),          # Replace ellipsis with a space
+    # ('...', ' '),           # Replace ellipsis with a space
+    # ('… ', ' '),            # Unicode ellipsis character
+    # ('…', ''),              # Unicode ellipsis character
+    ('—', ', '),              # Replace em dash with a space
+    ('–', ' '),               # En dash as well (often confused with em dash)
+    ('.,-', '.'),             # Replace .,- with just a period
+    ('.-', '.'),              # Replace ., with just a period
+    ('.,', '.'),              # Replace ., with just a period
+    (',-', ','),              # Replace ,- with just a comma
+    # ('-,', '-'),            # Replace -, with just a hyphen
+    ('--', ' '),              # Replace double hyphen with a space
+    ('*', ''),                # Remove asterisks completely
+]
+
+# Pattern for the additional safety check, compiled once
+MULTIPLE_PERIODS_RE = re.compile(r'\.{4,}')
+
 def clean_forbidden_punctuation(text):
     """
     Removes or replaces forbidden punctuation patterns from AI-generated text.
@@ -14,35 +37,18 @@ def clean_forbidden_punctuation(text):
     Returns:
         str: The cleaned text with all forbidden punctuation patterns removed or replaced
     """
-    # Dictionary of patterns and their replacements
-    replacements = {
-        r'-,': ',',              # Replace -, with just a comma
-        # r'\.\.\. ': ' ',         # Replace ellipsis with a space
-        # r'\.\.\.': ' ',          # Replace ellipsis with a space
-        # r'… ': ' ',              # Unicode ellipsis character
-        # r'…': '',                # Unicode ellipsis character
-        r'—': ', ',              # Replace em dash with a space
-        r'–': ' ',               # En dash as well (often confused with em dash)
-        r'\.,-': '.',            # Replace .,- with just a period
-        r'\.-': '.',             # Replace ., with just a period
-        r'\.,': '.',             # Replace ., with just a period
-        r',-': ',',              # Replace ,- with just a comma
-        # r'-,': '-',              # Replace -, with just a hyphen
-        r'--': ' ',              # Replace double hyphen with a space
-        r'\*': '',               # Remove asterisks completely
-    }
-    
-    # Process each pattern in turn
+    # Process each sequence in turn, most text has none of them and a substring check
+    # is cheaper than a replace that ends up copying the text unchanged
     cleaned_text = text
-    for pattern, replacement in replacements.items():
-        cleaned_text = re.sub(pattern, replacement, cleaned_text)
+    for sequence, replacement in PUNCTUATION_REPLACEMENTS:
+        if sequence in cleaned_text:
+            cleaned_text = cleaned_text.replace(sequence, replacement)
     
-    # Additional safety checks for multi-character sequences
-    # This catches any remaining multi-asterisk patterns
-    cleaned_text = re.sub(r'\*+', '', cleaned_text)
+    # No separate multi-asterisk pass is needed, the '*' entry above already removed every asterisk
     
     # This catches any attempt to create ellipsis with 4+ periods
-    cleaned_text = re.sub(r'\.{4,}', '.', cleaned_text)
+    if '....' in cleaned_text:
+        cleaned_text = MULTIPLE_PERIODS_RE.sub('.', cleaned_text)
     
     return cleaned_text
 
@@ -6,17 +6,43 @@
 #              that might hinder clarity and flow, following Ursula K. Le Guin's writing principles.
 #
 # Usage: 
-# python -B punctuation_auditor.py --manuscript_file manuscript.txt [--save_dir reports]
+# python -B punctuation_auditor.py --manuscript_file manuscript.txt [chapter2.txt ...] [--batch] [--save_dir reports]
 
 import anthropic
-import pypandoc
+from anthropic.types.message_create_params import MessageCreateParamsNonStreaming
+from anthropic.types.messages.batch_create_params import Request
 import os
 import argparse
+import asyncio
+import re
 import sys
+import tempfile
 import time
 from datetime import datetime
 
 
+RAW_WRITE_BUFFER = 64 * 1024  # bytes of streamed report (or thinking) text gathered per write to a .raw spool
+
+# the markdown that can slip through despite the "NO Markdown" instructions, and what each is
+# replaced with, applied in this order by strip_markdown (bullets before italics, so "* item"
+# isn't read as emphasis), unlike pandoc these leave the lines and their wrapping as they are
+MARKDOWN_PATTERNS = [
+    (re.compile(r'^```.*\n?', re.MULTILINE), ''),                 # code fence lines
+    (re.compile(r'^#{1,6}\s+', re.MULTILINE), ''),                # headers
+    (re.compile(r'^>\s?', re.MULTILINE), ''),                     # block quotes
+    (re.compile(r'^([ \t]*)[*+][ \t]+', re.MULTILINE), r'\1- '),  # bullets
+    (re.compile(r'\*\*(.+?)\*\*'), r'\1'),                        # bold
+    (re.compile(r'(?<!\w)__(.+?)__(?!\w)'), r'\1'),               # bold, but not inside snake_case words
+    (re.compile(r'\*([^*\n]+)\*'), r'\1'),                        # italic
+    (re.compile(r'`([^`\n]+)`'), r'\1'),                          # inline code
+    (re.compile(r'\[([^\]]+)\]\([^)]+\)'), r'\1'),                 # links, keeping the link text
+]
+
+# the markers around each element's section of a --split_elements report
+SECTION_MARKER_RE = re.compile(r'^(=== SECTION: .+? ===|=== END SECTION ===)[ \t]*$', re.MULTILINE)
+SECTION_RE = re.compile(r'^=== SECTION: (.+?) ===[ \t]*\n(.*?)^=== END SECTION ===', re.MULTILINE | re.DOTALL)
+
+
 def parse_arguments():
     parser = argparse.ArgumentParser(
         description='Analyze manuscript for punctuation effectiveness using Claude AI.',
@@ -26,6 +52,8 @@ Example usages:
   python -B punctuation_auditor.py --manuscript_file manuscript.txt --analysis_level detailed --strictness high
   python -B punctuation_auditor.py --manuscript_file manuscript.txt
   python -B punctuation_auditor.py --manuscript_file manuscript.txt --save_dir reports
+  python -B punctuation_auditor.py --manuscript_file chapter1.txt chapter2.txt chapter3.txt --batch
+  python -B punctuation_auditor.py --manuscript_file manuscript.txt --elements commas dashes run-ons --split_elements
         """
     )
 
@@ -36,8 +64,8 @@ Example usages:
     output_group = parser.add_argument_group('Output Configuration')
 
     # Add arguments to the Input Files group
-    input_group.add_argument('--manuscript_file', type=str, required=True,
-                           help="File containing the manuscript to analyze (required)")
+    input_group.add_argument('--manuscript_file', type=str, nargs='+', required=True,
+                           help="One or more manuscript (or chapter) files to analyze, each gets its own report (required)")
 
     # Add arguments to the Analysis Options group
     analysis_group.add_argument('--analysis_level', type=str, default="standard",
@@ -49,6 +77,8 @@ Example usages:
     analysis_group.add_argument('--strictness', type=str, default="medium",
                               choices=["low", "medium", "high"],
                               help="Strictness level for punctuation analysis (default: medium)")
+    analysis_group.add_argument('--split_elements', action='store_true',
+                              help="Give each punctuation element its own section, also saved as its own report file (one request for all of them)")
 
     # Add arguments to the Claude API Configuration group
     api_group.add_argument('--context_window', type=int, default=200000, 
@@ -61,6 +91,14 @@ Example usages:
                          help='User desired number of tokens to generate before stopping output')
     api_group.add_argument('--request_timeout', type=int, default=300,
                          help='Maximum timeout for each *streamed chunk* of output (default: 300 seconds)')
+    api_group.add_argument('--batch', action='store_true',
+                         help='Send all the manuscript files as one Message Batch (half the cost, but results can take a while)')
+    api_group.add_argument('--poll_interval', type=int, default=30,
+                         help='Seconds between checks on a submitted batch (default: 30 seconds)')
+    api_group.add_argument('--max_concurrency', type=int, default=4,
+                         help='Most manuscripts streamed at the same time, without --batch (default: 4)')
+    api_group.add_argument('--max_retries', type=int, default=4,
+                         help='Maximum times to retry a request after a rate limit or transient error, may get expensive if too many (default: 4)')
 
     # Add arguments to the Output Configuration group
     output_group.add_argument('--save_dir', type=str, default=".",
@@ -69,6 +107,8 @@ Example usages:
                             help='Skip saving the AI thinking process (smaller output files)')
     output_group.add_argument('--analysis_description', type=str, default="",
                             help="Optional description to include in output filenames")
+    output_group.add_argument('--use_pandoc', action='store_true',
+                            help='Strip Markdown from the output with pandoc instead of the built-in patterns (needs pypandoc and pandoc)')
 
     return parser.parse_args()
 
@@ -94,19 +134,41 @@ def count_words(text):
     return len(text.split())
 
 
-def strip_markdown(md_text):
-    try:
-        plain_text = pypandoc.convert_text(md_text, 'plain', format='markdown')
-        plain_text = plain_text.replace("\u00A0", " ")
-        return plain_text
-    except Exception as e:
-        print(f"Error converting markdown to plain text: {e}")
-        print("Make sure pypandoc and pandoc are properly installed.")
-        return md_text  # return original text if conversion fails
+def strip_markdown(md_text, use_pandoc=False):
+    if use_pandoc:
+        # the full pandoc conversion, which also rewraps the text, runs the pandoc binary each time
+        try:
+            import pypandoc
+            plain_text = pypandoc.convert_text(md_text, 'plain', format='markdown')
+            plain_text = plain_text.replace("\u00A0", " ")
+            return plain_text
+        except Exception as e:
+            print(f"Error converting markdown to plain text: {e}")
+            print("Make sure pypandoc and pandoc are properly installed.")
+            return md_text  # return original text if conversion fails
+    
+    plain_text = md_text
+    for pattern, replacement in MARKDOWN_PATTERNS:
+        plain_text = pattern.sub(replacement, plain_text)
+    return plain_text
+
+
+def strip_markdown_by_section(md_text, use_pandoc=False):
+    """Strip Markdown from a report split into sections, leaving the section markers on their own lines."""
+    if not use_pandoc:
+        # the patterns work within lines, the markers come through untouched
+        return strip_markdown(md_text)
+    # pandoc rewraps paragraphs, so the markers are kept out of it and the text between them
+    # is converted piece by piece (split puts the markers at the odd indexes)
+    pieces = SECTION_MARKER_RE.split(md_text)
+    return "\n".join(
+        piece if i % 2 else strip_markdown(piece, use_pandoc).strip("\n") if piece.strip() else ""
+        for i, piece in enumerate(pieces)
+    )
 
 
-def create_punctuation_analysis_prompt(manuscript_content, analysis_level, elements, strictness):
-    """Create a prompt for the AI to analyze punctuation effectiveness."""
+def create_punctuation_analysis_prompt(manuscript_content, analysis_level, elements, strictness, split_elements=False):
+    """Create the messages for the AI to analyze punctuation effectiveness."""
     
     # Build instruction section based on analysis level
     basic_instructions = """
@@ -181,6 +243,13 @@ def create_punctuation_analysis_prompt(manuscript_content, analysis_level, eleme
     
     strictness_text = strictness_instructions.get(strictness, strictness_instructions["medium"])
 
+    # one request covers every element, but each gets a clearly marked section of its own
+    sections_text = ""
+    if split_elements:
+        sections_text = f"""
+Organize the report into one section per punctuation element, in this order: {elements_text}. Begin each section with a line reading "=== SECTION: " followed by the element name exactly as written here and " ===", and end it with a line reading "=== END SECTION ===". Within each section, cover the analysis areas above as they apply to that element.
+"""
+
     # Construct the full prompt
     instructions = f"""IMPORTANT: NO Markdown formatting
 
@@ -204,124 +273,272 @@ For each issue you identify, provide:
 
 Create a comprehensive punctuation analysis with these sections:
 {instruction_set}
-
+{sections_text}
 Format your analysis as a clear, organized report with sections and subsections. Use plain text formatting only (NO Markdown). Use numbered or bulleted lists where appropriate for clarity.
 
 Be specific in your examples and suggestions, showing how punctuation can be improved without changing the author's voice or intention. Focus on practical changes that will make the writing more readable and effective.
 """
 
-    # Combine all sections
-    prompt = f"=== MANUSCRIPT ===\n{manuscript_content}\n=== END MANUSCRIPT ===\n\n{instructions}"
-    
-    return prompt
+    # The manuscript goes in its own block ahead of the instructions, marked for the prompt cache,
+    # so another run on the same manuscript (at a different level, strictness or elements)
+    # reads it from the cache instead of paying for it again
+    return [{
+        "role": "user",
+        "content": [
+            {"type": "text", "text": f"=== MANUSCRIPT ===\n{manuscript_content}\n=== END MANUSCRIPT ===\n\n",
+             "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": instructions}
+        ]
+    }]
 
 
-def run_punctuation_analysis(manuscript_content, args):
-    """Run punctuation analysis using Claude API and return results."""
-    prompt = create_punctuation_analysis_prompt(manuscript_content, args.analysis_level, args.elements, args.strictness)
+def estimate_prompt_tokens(messages):
+    """Estimate the prompt's input tokens from its length, without a count_tokens round-trip."""
+    # prose runs about 4 characters a token, counting 3 leans high so the
+    # max_tokens worked out from this stays inside the context window
+    prompt_chars = sum(len(block["text"]) for message in messages for block in message["content"])
+    return max(1, prompt_chars // 3)
 
-    client = anthropic.Anthropic(
-        timeout=args.request_timeout,
-        max_retries=0
-    )
-    
-    prompt_token_count = 0
-    try:
-        response = client.beta.messages.count_tokens(
-            model="claude-3-7-sonnet-20250219",
-            messages=[{"role": "user", "content": prompt}],
-            thinking={
-                "type": "enabled",
-                "budget_tokens": args.thinking_budget_tokens
-            },
-            betas=["output-128k-2025-02-19"]
-        )
-        prompt_token_count = response.input_tokens
-        print(f"Actual input/prompt tokens: {prompt_token_count}")
-    except Exception as e:
-        print(f"Token counting error: {e}")
 
+def actual_prompt_tokens(usage):
+    """The input tokens a response used, including the part read from or written to the prompt cache."""
+    return usage.input_tokens + (usage.cache_creation_input_tokens or 0) + (usage.cache_read_input_tokens or 0)
+
+
+def calculate_token_budget(prompt_tokens, args, batch=False):
+    """Return the available tokens, max_tokens and thinking budget for a prompt of this size."""
     # Calculate available tokens after prompt
-    prompt_tokens = prompt_token_count
     available_tokens = args.context_window - prompt_tokens
     # For API call, max_tokens must respect the API limit
     max_tokens = min(available_tokens, args.betas_max_tokens)
     # Thinking budget must be LESS than max_tokens to leave room for visible output
     thinking_budget = max_tokens - args.desired_output_tokens
-    if thinking_budget > 32000:
-        print(f"Warning: thinking budget is larger than 32K, reset to 32K. Use batch for larger thinking budgets.")
+    # only a streamed request is capped, a batch request may think for longer
+    if thinking_budget > 32000 and not batch:
+        print("Warning: thinking budget is larger than 32K, reset to 32K. Use batch for larger thinking budgets.")
         thinking_budget = 32000
+    return available_tokens, max_tokens, thinking_budget
+
 
-    print(f"Running punctuation effectiveness analysis...")
-    print(f"\nToken stats:")
-    print(f"Max AI model context window: [{args.context_window}] tokens")
-    print(f"Input prompt tokens: [{prompt_tokens}]")
-    print(f"Available tokens: [{available_tokens}]  = {args.context_window} - {prompt_tokens}")
-    print(f"Desired output tokens: [{args.desired_output_tokens}]")
-    print(f"AI model thinking budget: [{thinking_budget}] tokens")
-    print(f"Max output tokens (max_tokens): [{max_tokens}] tokens")
+async def run_punctuation_analysis(client, manuscript_file, manuscript_content, report_name, args):
+    """Run punctuation analysis using Claude API, save its report as soon as it completes and return results."""
+    messages = create_punctuation_analysis_prompt(manuscript_content, args.analysis_level, args.elements, args.strictness, args.split_elements)
+    
+    prompt_tokens = estimate_prompt_tokens(messages)
+    available_tokens, max_tokens, thinking_budget = calculate_token_budget(prompt_tokens, args)
+
+    # one write for the whole block, so it isn't broken up by another manuscript's output
+    sys.stdout.write("\n".join([
+        f"Running punctuation effectiveness analysis of {manuscript_file}...",
+        "\nToken stats:",
+        f"Max AI model context window: [{args.context_window}] tokens",
+        f"Estimated input prompt tokens: [{prompt_tokens}]",
+        f"Available tokens: [{available_tokens}]  = {args.context_window} - {prompt_tokens}",
+        f"Desired output tokens: [{args.desired_output_tokens}]",
+        f"AI model thinking budget: [{thinking_budget}] tokens",
+        f"Max output tokens (max_tokens): [{max_tokens}] tokens"
+    ]) + "\n")
+    sys.stdout.flush()
     
     if thinking_budget < args.thinking_budget_tokens:
-        print(f"Error: prompt is too large to have a {args.thinking_budget_tokens} thinking budget!")
-        sys.exit(1)
+        # only this manuscript is given up on, the others carry on
+        print(f"Error: {manuscript_file} is too large to have a {args.thinking_budget_tokens} thinking budget!")
+        return "", "", 0, 0
     
-    full_response = ""
-    thinking_content = ""
+    # the report and thinking text go straight to .raw files as they stream in rather than being
+    # held in memory, so a stream that fails part way still leaves what arrived on disk
+    os.makedirs(args.save_dir, exist_ok=True)
+    manuscript_name = os.path.splitext(os.path.basename(manuscript_file))[0]
+    # mkstemp makes the names unique, manuscripts streamed side by side can share a basename
+    # and start in the same second
+    raw_prefix = f"punctuation_audit_{manuscript_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_"
+    raw_fd, raw_filename = tempfile.mkstemp(prefix=raw_prefix, suffix=".raw", dir=args.save_dir)
+    thinking_fd, thinking_filename = tempfile.mkstemp(prefix=raw_prefix, suffix="_thinking.raw", dir=args.save_dir)
     
     start_time = time.time()
-    print(f"Sending request to Claude API...")
+    print("Sending request to Claude API...")
     
     try:
-        with client.beta.messages.stream(
-            model="claude-3-7-sonnet-20250219",
-            max_tokens=max_tokens,
-            messages=[{"role": "user", "content": prompt}],
-            thinking={
-                "type": "enabled",
-                "budget_tokens": thinking_budget
-            },
-            betas=["output-128k-2025-02-19"]
-        ) as stream:
-            for event in stream:
-                if event.type == "content_block_delta":
-                    if event.delta.type == "thinking_delta":
-                        thinking_content += event.delta.thinking
-                    elif event.delta.type == "text_delta":
-                        full_response += event.delta.text
+        # the deltas are only a few characters each, a 64KB buffer gathers them into large writes
+        with open(raw_fd, 'w', encoding='utf-8', buffering=RAW_WRITE_BUFFER) as raw_file, \
+             open(thinking_fd, 'w', encoding='utf-8', buffering=RAW_WRITE_BUFFER) as thinking_file:
+            async with client.beta.messages.stream(
+                model="claude-3-7-sonnet-20250219",
+                max_tokens=max_tokens,
+                messages=messages,
+                thinking={
+                    "type": "enabled",
+                    "budget_tokens": thinking_budget
+                },
+                betas=["output-128k-2025-02-19"]
+            ) as stream:
+                async for event in stream:
+                    if event.type == "content_block_delta":
+                        if event.delta.type == "thinking_delta":
+                            thinking_file.write(event.delta.thinking)
+                        elif event.delta.type == "text_delta":
+                            raw_file.write(event.delta.text)
+                # the final message reports the actual input tokens, the output tokens (thinking plus
+                # report) and the prompt cache use, no count_tokens round-trips needed
+                usage = (await stream.get_final_message()).usage
+                prompt_token_count = actual_prompt_tokens(usage)
+                report_token_count = usage.output_tokens
+                print(f"\nActual input/prompt tokens ({manuscript_file}): {prompt_token_count}")
+                print(f"Prompt cache ({manuscript_file}): {usage.cache_read_input_tokens or 0} tokens read, {usage.cache_creation_input_tokens or 0} tokens written")
     except Exception as e:
-        print(f"\nAPI Error:\n{e}\n")
+        print(f"\nAPI Error ({manuscript_file}):\n{e}\n")
+        print(f"The partial report (if any) was kept in: {raw_filename}")
+        print(f"The partial thinking (if any) was kept in: {thinking_filename}")
         return "", "", 0, 0
     
+    with open(raw_filename, 'r', encoding='utf-8') as raw_file:
+        full_response = raw_file.read()
+    with open(thinking_filename, 'r', encoding='utf-8') as thinking_file:
+        thinking_content = thinking_file.read()
+    
     elapsed = time.time() - start_time
     minutes = int(elapsed // 60)
     seconds = elapsed % 60
     
     report_word_count = count_words(full_response)
-    print(f"\nCompleted in {minutes}m {seconds:.2f}s.\nReport has {report_word_count} words.")
+    print(f"\nCompleted {manuscript_file} in {minutes}m {seconds:.2f}s.\nReport has {report_word_count} words.")
+    
+    # Convert any Markdown formatting to plain text
+    plain_text_response = strip_markdown_by_section(full_response, args.use_pandoc) if args.split_elements else strip_markdown(full_response, args.use_pandoc)
+    result = (plain_text_response, thinking_content, prompt_token_count, report_token_count)
+    
+    # saved now rather than once every other stream has ended, and the raw spools are only
+    # removed after that, so an interrupted run never loses a report that had completed
+    # (an empty report is reported as a failure once all the streams are done)
+    if plain_text_response:
+        report_for_manuscript(manuscript_file, result, report_name, args)
+    os.remove(raw_filename)
+    os.remove(thinking_filename)
+    
+    return result
+
+
+async def run_punctuation_analyses(manuscripts, report_names, args):
+    """Stream every manuscript's analysis, at most --max_concurrency of them at the same time, saving each report as it completes."""
+    # one client for all of them, so the streams share its connection pool, and its own
+    # retries (with exponential backoff) ride out rate limits before a stream starts
+    client = anthropic.AsyncAnthropic(
+        timeout=args.request_timeout,
+        max_retries=args.max_retries
+    )
+    semaphore = asyncio.Semaphore(args.max_concurrency)
+    
+    async def run_when_allowed(manuscript_file, manuscript_content):
+        async with semaphore:
+            return await run_punctuation_analysis(client, manuscript_file, manuscript_content,
+                                                  report_names.get(manuscript_file), args)
+    
+    analyses = await asyncio.gather(*[
+        run_when_allowed(manuscript_file, manuscript_content)
+        for manuscript_file, manuscript_content in manuscripts
+    ], return_exceptions=True)
+    
+    results = {}
+    for (manuscript_file, _), result in zip(manuscripts, analyses):
+        # a cancelled stream comes back as a CancelledError, which is not an Exception
+        if isinstance(result, BaseException):
+            print(f"Error: the analysis of {manuscript_file} failed: {str(result) or type(result).__name__}")
+            continue
+        results[manuscript_file] = result
+    return results
+
+
+def run_batch_punctuation_analysis(manuscripts, args):
+    """Send every manuscript's analysis as one Message Batch, wait for it to end and return the results by file."""
+    client = anthropic.Anthropic(
+        timeout=args.request_timeout,
+        max_retries=0
+    )
+    
+    requests = []
+    manuscript_files = {}
+    for manuscript_file, manuscript_content in manuscripts:
+        messages = create_punctuation_analysis_prompt(manuscript_content, args.analysis_level, args.elements, args.strictness, args.split_elements)
+        print(f"\nPreparing the punctuation analysis of: {manuscript_file}")
+        available_tokens, max_tokens, thinking_budget = calculate_token_budget(estimate_prompt_tokens(messages), args, batch=True)
+        if thinking_budget < args.thinking_budget_tokens:
+            # only this manuscript is left out of the batch, as it is when streaming
+            print(f"Error: {manuscript_file} is too large to have a {args.thinking_budget_tokens} thinking budget!")
+            continue
+        # the custom_id is how each result finds its way back to its manuscript file
+        custom_id = f"manuscript_{len(requests)}"
+        manuscript_files[custom_id] = manuscript_file
+        requests.append(
+            Request(
+                custom_id=custom_id,
+                params=MessageCreateParamsNonStreaming(
+                    model="claude-3-7-sonnet-20250219",
+                    max_tokens=max_tokens,
+                    messages=messages,
+                    thinking={
+                        "type": "enabled",
+                        "budget_tokens": thinking_budget
+                    }
+                )
+            )
+        )
     
-    # Get token count for response
-    report_token_count = 0
+    if not requests:
+        return {}
+    
+    start_time = time.time()
     try:
-        response = client.beta.messages.count_tokens(
-            model="claude-3-7-sonnet-20250219",
-            messages=[{"role": "user", "content": full_response}],
-            thinking={
-                "type": "enabled",
-                "budget_tokens": thinking_budget
-            },
-            betas=["output-128k-2025-02-19"]
+        batch = client.beta.messages.batches.create(
+            betas=["output-128k-2025-02-19"],
+            requests=requests
         )
-        report_token_count = response.input_tokens
+        print(f"\nBatch request created with ID: {batch.id}")
+        print(f"(if this is interrupted, the results can still be fetched with: python batch_retriever.py {batch.id})")
+        while batch.processing_status != "ended":
+            time.sleep(args.poll_interval)
+            batch = client.beta.messages.batches.retrieve(batch.id)
+            counts = batch.request_counts
+            print(f"Batch status: {batch.processing_status}, {counts.processing} processing, "
+                  f"{counts.succeeded} succeeded, {counts.errored} errored, {counts.expired} expired")
     except Exception as e:
-        print(f"Response token counting error:\n{e}\n")
+        print(f"\nAPI Error:\n{e}\n")
+        return {}
     
-    # Convert any Markdown formatting to plain text
-    plain_text_response = strip_markdown(full_response)
+    elapsed = time.time() - start_time
+    print(f"\nBatch ended after {int(elapsed // 60)}m {elapsed % 60:.2f}s.")
+    
+    results = {}
+    try:
+        for result in client.beta.messages.batches.results(batch.id):
+            manuscript_file = manuscript_files[result.custom_id]
+            if result.result.type != "succeeded":
+                print(f"⨯ The analysis of {manuscript_file} {result.result.type}")
+                continue
+            
+            message = result.result.message
+            response_parts = []
+            thinking_parts = []
+            for content_block in message.content:
+                if content_block.type == "text":
+                    response_parts.append(content_block.text)
+                elif content_block.type == "thinking":
+                    thinking_parts.append(content_block.thinking)
+            full_response = "".join(response_parts)
+            print(f"✓ The analysis of {manuscript_file} has {count_words(full_response)} words.")
+            
+            results[manuscript_file] = (
+                strip_markdown_by_section(full_response, args.use_pandoc) if args.split_elements else strip_markdown(full_response, args.use_pandoc),
+                "".join(thinking_parts),
+                actual_prompt_tokens(message.usage), message.usage.output_tokens
+            )
+    except Exception as e:
+        print(f"\nError retrieving the batch results:\n{e}\n")
+        print(f"Try again later with: python batch_retriever.py {batch.id}")
     
-    return plain_text_response, thinking_content, prompt_token_count, report_token_count
+    return results
 
 
-def save_report(full_response, thinking_content, prompt_token_count, report_token_count, args, stats):
+def save_report(full_response, thinking_content, prompt_token_count, report_token_count, args, stats, report_name=None):
     """Save the punctuation analysis report and thinking content to files."""
     # Create save directory if it doesn't exist
     os.makedirs(args.save_dir, exist_ok=True)
@@ -330,20 +547,31 @@ def save_report(full_response, thinking_content, prompt_token_count, report_toke
     desc = f"_{args.analysis_description}" if args.analysis_description else ""
     analysis_level = f"_{args.analysis_level}" if args.analysis_level != "standard" else ""
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    base_filename = f"punctuation_audit{desc}{analysis_level}_{timestamp}"
+    # with several manuscripts, each report is named after its own file
+    name = f"_{report_name}" if report_name else ""
+    base_filename = f"punctuation_audit{name}{desc}{analysis_level}_{timestamp}"
     
     # Save full response
     report_filename = f"{args.save_dir}/{base_filename}.txt"
     with open(report_filename, 'w', encoding='utf-8') as file:
         file.write(full_response)
     
+    # each element's section also goes to its own file, next to the full report
+    if args.split_elements:
+        for element, section in SECTION_RE.findall(full_response):
+            element_name = re.sub(r'\W+', '_', element).strip('_').lower()
+            section_filename = f"{args.save_dir}/{base_filename}_{element_name}.txt"
+            with open(section_filename, 'w', encoding='utf-8') as file:
+                file.write(section.strip() + "\n")
+            print(f"Section '{element}' saved to: {section_filename}")
+    
     # Save thinking content if available and not skipped
     if thinking_content and not args.skip_thinking:
         thinking_filename = f"{args.save_dir}/{base_filename}_thinking.txt"
         with open(thinking_filename, 'w', encoding='utf-8') as file:
             file.write("=== PUNCTUATION EFFECTIVENESS ANALYSIS ===\n\n")
             file.write("=== AI'S THINKING PROCESS ===\n\n")
-            file.write(strip_markdown(thinking_content))  # Also strip markdown from thinking content
+            file.write(strip_markdown(thinking_content, args.use_pandoc))  # Also strip markdown from thinking content
             file.write("\n=== END AI'S THINKING PROCESS ===\n")
             file.write(stats)
         print(f"AI thinking saved to: {thinking_filename}")
@@ -352,30 +580,27 @@ def save_report(full_response, thinking_content, prompt_token_count, report_toke
     return report_filename
 
 
-def main():
-    args = parse_arguments()
-    
-    manuscript_content = read_file(args.manuscript_file, "manuscript")
-    
-    current_time = datetime.now().strftime("%I:%M:%S %p").lower().lstrip("0")
-    print("\n=== Punctuation Auditor Configuration ===")
-    print(f"Input file: {args.manuscript_file}")
-    print(f"Analysis level: {args.analysis_level}")
-    print(f"Punctuation elements: {', '.join(args.elements)}")
-    print(f"Strictness level: {args.strictness}")
-    print(f"Max request timeout: {args.request_timeout} seconds for each streamed chunk")
-    print(f"Save directory: {os.path.abspath(args.save_dir)}")
-    print(f"Started at: {current_time}")
-    print("=" * 40 + "\n")
-    
-    full_response, thinking_content, prompt_token_count, report_token_count = run_punctuation_analysis(
-        manuscript_content, args
-    )
-    
+def create_report_names(manuscript_files):
+    """Name each manuscript's reports after its file, adding the parent folder (or its position) when basenames collide."""
+    # reports are saved with a timestamp to the second, so two reports named after
+    # chapters/draft.txt and notes/draft.txt would overwrite each other
+    names = [os.path.splitext(os.path.basename(manuscript_file))[0] for manuscript_file in manuscript_files]
+    names = [
+        f"{os.path.basename(os.path.dirname(os.path.abspath(manuscript_file)))}_{name}" if names.count(name) > 1 else name
+        for manuscript_file, name in zip(manuscript_files, names)
+    ]
+    names = [f"{name}_{i}" if names.count(name) > 1 else name for i, name in enumerate(names, 1)]
+    return dict(zip(manuscript_files, names))
+
+
+def report_for_manuscript(manuscript_file, result, report_name, args):
+    """Save one manuscript's report, along with its run details."""
+    full_response, thinking_content, prompt_token_count, report_token_count = result or ("", "", 0, 0)
     if full_response:
         stats = f"""
 Details:
 Analysis type: Punctuation effectiveness analysis
+Input file: {manuscript_file}
 Analysis level: {args.analysis_level}
 Punctuation elements: {', '.join(args.elements)}
 Strictness level: {args.strictness}
@@ -388,9 +613,48 @@ Input tokens: {prompt_token_count}
 Output tokens: {report_token_count}
 """
         
-        save_report(full_response, thinking_content, prompt_token_count, report_token_count, args, stats)
+        save_report(full_response, thinking_content, prompt_token_count, report_token_count, args, stats,
+                    report_name)
+    else:
+        print(f"Failed to complete punctuation analysis of {manuscript_file}.")
+
+
+def main():
+    args = parse_arguments()
+    
+    # a file given twice would only be analyzed (and paid for) twice
+    manuscripts = [(manuscript_file, read_file(manuscript_file, "manuscript"))
+                   for manuscript_file in dict.fromkeys(args.manuscript_file)]
+    
+    current_time = datetime.now().strftime("%I:%M:%S %p").lower().lstrip("0")
+    print("\n=== Punctuation Auditor Configuration ===")
+    print(f"Input file: {', '.join(manuscript_file for manuscript_file, _ in manuscripts)}")
+    print(f"Batch: {'Enabled' if args.batch else 'Disabled'}")
+    print(f"Analysis level: {args.analysis_level}")
+    print(f"Punctuation elements: {', '.join(args.elements)}")
+    print(f"Strictness level: {args.strictness}")
+    print(f"Split by element: {'Enabled' if args.split_elements else 'Disabled'}")
+    print(f"Max request timeout: {args.request_timeout} seconds for each streamed chunk")
+    if not args.batch:
+        print(f"Max concurrency: {args.max_concurrency} manuscripts streamed at a time")
+    print(f"Max retries: {args.max_retries}")
+    print(f"Save directory: {os.path.abspath(args.save_dir)}")
+    print(f"Started at: {current_time}")
+    print("=" * 40 + "\n")
+    
+    # with one manuscript the reports keep their usual names
+    report_names = create_report_names([manuscript_file for manuscript_file, _ in manuscripts]) if len(manuscripts) > 1 else {}
+    
+    if args.batch:
+        results = run_batch_punctuation_analysis(manuscripts, args)
+        for manuscript_file, _ in manuscripts:
+            report_for_manuscript(manuscript_file, results.get(manuscript_file), report_names.get(manuscript_file), args)
     else:
-        print("Failed to complete punctuation analysis.")
+        # each streamed report is saved as soon as its own stream completes
+        results = asyncio.run(run_punctuation_analyses(manuscripts, report_names, args))
+        for manuscript_file, _ in manuscripts:
+            if not results.get(manuscript_file, ("",))[0]:
+                print(f"Failed to complete punctuation analysis of {manuscript_file}.")
 
 
 if __name__ == "__main__":
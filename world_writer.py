@@ -2,15 +2,22 @@
 # world_writer --title "Tracking the Dead Wax" --pov "third person perspective" --outline_file outline.txt --characters_file characters.txt --detailed
 # python -B world_writer.py --outline_file outline.txt --detailed
 # pip install anthropic
+# optional: pip install httpx[http2]   (lets the token counts and the stream share one HTTP/2 connection)
 # tested with: anthropic 0.49.0 circa March 2025
 import anthropic
+import httpx
 import os
 import argparse
-import re
 import sys
 import time
 from datetime import datetime
 
+try:
+    import h2  # noqa: F401  httpx only speaks HTTP/2 when the h2 package is installed
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 parser = argparse.ArgumentParser(description='Extract and develop characters and world elements from a novel outline.')
 parser.add_argument('--request_timeout', type=int, default=600, help='Maximum timeout for output (default: 600 seconds)')
 """
@@ -39,7 +46,7 @@ parser.add_argument('--save_dir',           type=str, default=".")
 args = parser.parse_args()
 
 def count_words(text):
-    return len(re.sub(r'(\r\n|\r|\n)', ' ', text).split())
+    return len(text.split())
 
 # load the characters file
 characters_content = ""
@@ -191,6 +198,12 @@ print(f"Generating world document (including characters) for novel: {args.title}
 print(f"Setting max_tokens to: {max_tokens}")
 
 client = anthropic.Anthropic(
+    # one keep-alive connection pool (HTTP/2 when h2 is installed) for the prompt token count,
+    # the stream, and the output token count, so only the first request pays for the TLS handshake
+    http_client=anthropic.DefaultHttpxClient(
+        http2=HTTP2_AVAILABLE,
+        limits=httpx.Limits(max_keepalive_connections=1, keepalive_expiry=60.0),
+    ),
     timeout=args.request_timeout,
     max_retries=0  # default is 2
 )
@@ -212,13 +225,13 @@ try:
 except Exception as e:
     print(f"Error counting tokens:\n{e}\n")
 
-world_response = ""
-world_thinking = ""
+world_response_parts = []
+world_thinking_parts = []
 
 start_time = time.time()
 
 dt = datetime.fromtimestamp(start_time)
-formatted_time = dt.strftime("%A %B %d, %Y %I:%M:%S %p").replace(" 0", " ").lower()
+formatted_time = f"{dt:%A %B} {dt.day}, {dt.year} {dt.hour % 12 or 12}:{dt:%M:%S}".lower() + (" am" if dt.hour < 12 else " pm")
 print(f"****************************************************************************")
 print(f"*  Generating world document with character profiles...")
 print(f"*  sending to API at: {formatted_time}")
@@ -248,12 +261,15 @@ try:
         for event in stream:
             if event.type == "content_block_delta":
                 if event.delta.type == "thinking_delta":
-                    world_thinking += event.delta.thinking
+                    world_thinking_parts.append(event.delta.thinking)
                 elif event.delta.type == "text_delta":
-                    world_response += event.delta.text
+                    world_response_parts.append(event.delta.text)
 except Exception as e:
     print(f"Error generating world document:\n{e}\n")
 
+world_response = "".join(world_response_parts)
+world_thinking = "".join(world_thinking_parts)
+
 elapsed = time.time() - start_time
 minutes = int(elapsed // 60)
 seconds = elapsed % 60
@@ -305,9 +321,3 @@ if world_thinking:
 
 print(f"\nFiles saved to: {absolute_path}")
 print(f"###\n")
-
-# clean up variables
-world_prompt = None
-world_response = None
-world_thinking = None
-client = None
@@ -11,10 +11,32 @@ import platform
 import time
 import uuid
 import urllib.parse
+import shutil
+import hashlib
+import pickle
+import struct
+import shlex
+import codecs
 from copy import deepcopy
+from functools import lru_cache, partial
+from itertools import chain
+from collections import OrderedDict
 
 from nicegui import ui, run, app
 
+# orjson parses the tools config much faster than the stdlib, use it when installed
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+# google-re2 matches in linear time, use it for our module-level patterns when installed
+try:
+    import re2 as re_engine
+except ImportError:
+    re_engine = re
+
 from file_folder_local_picker import local_file_picker
 
 import editor_module
@@ -39,6 +61,28 @@ CURRENT_PROJECT_PATH = None
 # Default JSON file path for tool configurations
 TOOLS_JSON_PATH = "tools_config.json"
 
+# Read/write buffer for config files, 1 MiB means about one syscall per MB
+CONFIG_BUFFER_SIZE = 1 << 20
+
+# Pickled copy of the parsed tools config, valid while the JSON mtime and size match
+TOOLS_CACHE_PATH = f"{TOOLS_JSON_PATH}.cache.pkl"
+TOOLS_CACHE_HEADER = struct.Struct('<qq')  # (st_mtime_ns, st_size)
+
+# Number of content-addressed config backups (tools_config.json.<hash>.bak) to keep
+CONFIG_BACKUPS_TO_KEEP = 10
+# Only those backups match, not the plain tools_config.json.bak that save_tools_config keeps
+CONFIG_BACKUP_NAME_RE = re_engine.compile(re.escape(os.path.basename(TOOLS_JSON_PATH)) + r'\.[0-9a-f]{12}\.bak')
+
+# Tool output is read in chunks of this size and split into lines here, so a
+# line longer than the StreamReader limit (e.g. a row of progress dots) is fine
+TOOL_OUTPUT_READ_SIZE = 1 << 16
+# Once this much of an unfinished line is waiting it is shown in the log
+# without waiting for its newline
+TOOL_OUTPUT_PARTIAL_LINE = 80
+
+# Characters that are not allowed in a project (directory) name
+INVALID_PROJECT_NAME_RE = re_engine.compile(r'[<>:"/\\|?*]')
+
 # Add a global variable for the timer task
 timer_task = None
 
@@ -48,6 +92,16 @@ tool_in_progress = None
 # We'll collect references to all "Run" buttons here so we can disable/enable them.
 run_buttons = []
 
+# Most entries kept in a tool run's output log, older entries are dropped
+TOOL_LOG_MAX_LINES = 5000
+
+# Options per tool, keyed by (script_name, mtime of TOOLS_JSON_PATH), most recent last
+tool_options_cache = OrderedDict()
+TOOL_OPTIONS_CACHE_SIZE = 32
+# (option types, required option names) per tool, keyed the same way, most recent last
+option_specs_cache = OrderedDict()
+OPTION_SPECS_CACHE_SIZE = 128
+
 def open_file_in_editor(file_path):
     """Open a file in the integrated text editor in a new tab."""
     try:
@@ -60,27 +114,92 @@ def open_file_in_editor(file_path):
 # FUNCTION: Simplified JSON Config handling with Integer Enforcement
 ###############################################################################
 
-def load_tools_config(force_reload=False):
+def read_tools_config_cache(stat):
     """
-    Load tool configurations from the JSON file.
-    Also loads global settings if available.
+    Load the pickled tools config if it was written for this exact JSON file.
     
     Args:
-        force_reload: If True, bypasses any caching and reloads directly from disk
+        stat: os.stat() result of TOOLS_JSON_PATH
+        
+    Returns:
+        Dictionary of tool configurations or None if the cache is missing/stale
+    """
+    try:
+        with open(TOOLS_CACHE_PATH, 'rb', buffering=CONFIG_BUFFER_SIZE) as f:
+            header = f.read(TOOLS_CACHE_HEADER.size)
+            if header != TOOLS_CACHE_HEADER.pack(stat.st_mtime_ns, stat.st_size):
+                return None
+            return pickle.load(f)
+    except Exception:
+        return None
+
+def write_tools_config_cache(stat, config):
+    """
+    Atomically write the pickled tools config next to the JSON file.
+    
+    Args:
+        stat: os.stat() result of TOOLS_JSON_PATH when config was parsed
+        config: Dictionary of tool configurations
+    """
+    tmp_path = f"{TOOLS_CACHE_PATH}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, 'wb', buffering=CONFIG_BUFFER_SIZE) as f:
+            f.write(TOOLS_CACHE_HEADER.pack(stat.st_mtime_ns, stat.st_size))
+            pickle.dump(config, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, TOOLS_CACHE_PATH)
+    except Exception as e:
+        print(f"Warning: could not write tools config cache: {str(e)}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def invalidate_tools_config_cache():
+    """Remove the pickled tools config so the next load parses the JSON."""
+    try:
+        os.remove(TOOLS_CACHE_PATH)
+    except FileNotFoundError:
+        pass
+
+def intern_option_names(config):
+    """
+    Intern every option name, e.g. "--save_dir" appears in most tools, so the
+    many dicts keyed by option name share one string with a cached hash.
+    """
+    for key, tool_config in config.items():
+        if key.startswith('_') or not isinstance(tool_config, dict):
+            continue
+        for option in tool_config.get('options', []):
+            if isinstance(option.get('name'), str):
+                option['name'] = sys.intern(option['name'])
+
+def ensure_and_load_tools_config():
+    """
+    Check for and load the JSON configuration file in a single pass.
+    Also loads global settings if available.
     
     Returns:
-        Dictionary of tool configurations or empty dict if file not found/invalid
+        Tuple of (config, problem): config is the dictionary of tool
+        configurations or None, problem is None or a message describing
+        why the file could not be loaded
     """
     global DEFAULT_SAVE_DIR, CURRENT_PROJECT, CURRENT_PROJECT_PATH  # Ensure we can modify the global variables
     
-    if not os.path.exists(TOOLS_JSON_PATH):
-        ui.notify(f"Error: Configuration file not found at {TOOLS_JSON_PATH}", type="negative")
-        return {}
+    try:
+        stat = os.stat(TOOLS_JSON_PATH)
+        config = read_tools_config_cache(stat)
+        if config is None:
+            with open(TOOLS_JSON_PATH, 'rb', buffering=CONFIG_BUFFER_SIZE) as f:
+                config = json_loads(f.read())
+            write_tools_config_cache(stat, config)
+        intern_option_names(config)
+    except FileNotFoundError:
+        return None, f"Configuration file not found at {TOOLS_JSON_PATH}"
+    except ValueError as e:
+        # json.JSONDecodeError and orjson.JSONDecodeError both derive from ValueError
+        return None, f"Error parsing JSON config: {str(e)}"
+    except Exception as e:
+        return None, f"Error loading JSON config: {str(e)}"
     
     try:
-        with open(TOOLS_JSON_PATH, 'r') as f:
-            config = json.load(f)
-        
         # Check for global settings and update DEFAULT_SAVE_DIR if available
         if "_global_settings" in config:
             global_settings = config["_global_settings"]
@@ -119,11 +238,28 @@ def load_tools_config(force_reload=False):
                 # Fallback to projects directory
                 DEFAULT_SAVE_DIR = PROJECTS_DIR
         
-        return config
+        return config, None
     except Exception as e:
-        print(f"\nError loading JSON config:\n{str(e)}\n")
-        ui.notify(f"Error loading JSON config: {str(e)}", type="negative")
+        return None, f"Error loading JSON config: {str(e)}"
+
+def load_tools_config(force_reload=False):
+    """
+    Load tool configurations from the JSON file.
+    Also loads global settings if available.
+    
+    Args:
+        force_reload: Kept for callers; the pickled cache is always checked
+                      against the JSON file's mtime and size, so it is never stale
+    
+    Returns:
+        Dictionary of tool configurations or empty dict if file not found/invalid
+    """
+    config, problem = ensure_and_load_tools_config()
+    if problem:
+        print(f"\n{problem}\n")
+        ui.notify(problem, type="negative")
         return {}
+    return config
 
 def save_global_settings(settings_dict):
     """
@@ -156,7 +292,8 @@ def save_global_settings(settings_dict):
         if len(config.keys()) <= 1:  # Only _global_settings or empty
             backup_path = f"{TOOLS_JSON_PATH}.before_error"
             try:
-                with open(TOOLS_JSON_PATH, 'r') as src, open(backup_path, 'w') as dst:
+                with open(TOOLS_JSON_PATH, 'rb', buffering=CONFIG_BUFFER_SIZE) as src, \
+                     open(backup_path, 'wb', buffering=CONFIG_BUFFER_SIZE) as dst:
                     dst.write(src.read())
                 ui.notify(f"Error: Configuration would be invalid. Created safety backup at {backup_path}", 
                          type="negative")
@@ -222,7 +359,8 @@ def save_tools_config(config):
         if os.path.exists(TOOLS_JSON_PATH):
             backup_path = f"{TOOLS_JSON_PATH}.bak"
             try:
-                with open(TOOLS_JSON_PATH, 'r') as src, open(backup_path, 'w') as dst:
+                with open(TOOLS_JSON_PATH, 'rb', buffering=CONFIG_BUFFER_SIZE) as src, \
+                     open(backup_path, 'wb', buffering=CONFIG_BUFFER_SIZE) as dst:
                     dst.write(src.read())
             except Exception as e:
                 ui.notify(f"Warning: Failed to create backup file: {str(e)}", type="warning")
@@ -231,8 +369,11 @@ def save_tools_config(config):
         integer_config = ensure_integer_values(config)
         
         # Write the entire configuration to the file
-        with open(TOOLS_JSON_PATH, 'w') as f:
+        with open(TOOLS_JSON_PATH, 'w', buffering=CONFIG_BUFFER_SIZE) as f:
             json.dump(integer_config, f, indent=4)
+        # A same-size rewrite within the mtime granularity would still match
+        # the pickle's (mtime, size) key, so drop it explicitly
+        invalidate_tools_config_cache()
         return True
     except Exception as e:
         ui.notify(f"Error saving configuration: {str(e)}", type="negative")
@@ -441,22 +582,100 @@ def create_parser_for_tool(script_name, options):
     
     return parser
 
-def run_tool(script_name, args_dict, log_output=None):
+class LogBatcher:
+    """
+    Collect lines for a ui.log and push them together, either once
+    max_lines are waiting or interval seconds after the first one arrived,
+    so a chatty tool does not cause one websocket update per line.
+    """
+    def __init__(self, log, interval=0.02, max_lines=50):
+        self.log = log
+        self.interval = interval
+        self.max_lines = max_lines
+        self.lines = []
+        self.flush_task = None
+    
+    def append(self, line):
+        self.lines.append(line)
+        if len(self.lines) >= self.max_lines:
+            self.flush()
+        elif self.flush_task is None:
+            self.flush_task = asyncio.create_task(self.flush_later())
+    
+    async def flush_later(self):
+        await asyncio.sleep(self.interval)
+        self.flush_task = None
+        self.flush()
+    
+    def flush(self):
+        if self.lines:
+            self.log.push("\n".join(self.lines))
+            self.lines.clear()
+    
+    def close(self):
+        """Cancel any pending timer and push whatever is left."""
+        if self.flush_task:
+            self.flush_task.cancel()
+            self.flush_task = None
+        self.flush()
+
+def get_option_specs(script_name):
+    """
+    Get the option types and required option names for a script.
+    The result is cached until tools_config.json changes on disk.
+    
+    Args:
+        script_name: The script filename
+        
+    Returns:
+        Tuple of (dict mapping option names to types, tuple of required option names)
+    """
+    try:
+        mtime_ns = os.stat(TOOLS_JSON_PATH).st_mtime_ns
+    except OSError:
+        mtime_ns = None
+    key = (script_name, mtime_ns)
+    specs = option_specs_cache.get(key)
+    if specs is not None:
+        option_specs_cache.move_to_end(key)
+        return specs
+    config = load_tools_config()
+    specs = build_option_specs(config.get(script_name, {}).get("options", []))
+    option_specs_cache[key] = specs
+    while len(option_specs_cache) > OPTION_SPECS_CACHE_SIZE:
+        option_specs_cache.popitem(last=False)
+    return specs
+
+def build_option_specs(options):
+    """
+    Build the option specs from a tool's options list.
+    
+    Returns:
+        Tuple of (dict mapping option names to types, tuple of required option names)
+    """
+    option_types = {opt["name"]: opt.get("type", "str") for opt in options}
+    required_options = tuple(opt["name"] for opt in options if opt.get("required", False))
+    return option_types, required_options
+
+@lru_cache(maxsize=None)
+def resolve_script_path(script_name):
+    """Absolute path of a tool script, resolved once per script."""
+    return os.path.abspath(script_name)
+
+async def run_tool(script_name, args_dict, log_output=None):
     """
     Run a tool script with the provided arguments and track output files.
+    Output is streamed line by line into the log while the tool runs.
     Args:
         script_name: The script filename to run
         args_dict: Dictionary of argument name-value pairs
         log_output: A ui.log component to output to in real-time
     Returns:
-        Tuple of (stdout, stderr, created_files) from the subprocess
+        Tuple of (stdout, stderr, created_files) from the subprocess,
+        stderr is merged into stdout so it is always empty
     """
-    # Get the tool configuration to determine types
-    config = load_tools_config()
-    options = config.get(script_name, {}).get("options", [])
-    
-    # Create a mapping of option names to their types
-    option_types = {opt["name"]: opt.get("type", "str") for opt in options}
+    # Get the mapping of option names to their types from the tool configuration
+    option_types, _ = get_option_specs(script_name)
     
     # Generate a unique ID for this tool run
     run_uuid = str(uuid.uuid4())
@@ -494,50 +713,80 @@ def run_tool(script_name, args_dict, log_output=None):
             args_list.append(name)
             args_list.append(str(value))
     
-    # Determine the Python executable based on platform
-    if platform.system() == 'Windows':
-        python_exe = 'python'  # Using python directly; change to 'py' if needed
-    else:
-        python_exe = 'python'
-    
+    # Run tools with this interpreter (an absolute path, so no PATH search per run)
     # Construct the full command: python script_name [args]
-    cmd = [python_exe, "-u", script_name] + args_list
+    cmd = [sys.executable, "-u", resolve_script_path(script_name)] + args_list
     
     if log_output:
         # Log the command
         log_output.push(f"Running command: {' '.join(cmd)}")
         log_output.push("Working...")
     
-    # Run the command and capture output
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    # Run the command, streaming stdout (with stderr merged in) as it is produced
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT
+    )
+    output_lines = []
+    batcher = LogBatcher(log_output) if log_output else None
+    
+    # Characters of the unfinished line already pushed to the log
+    shown = 0
+    
+    def emit(line):
+        nonlocal shown
+        line = line.rstrip()
+        output_lines.append(line)
+        if batcher and (shown == 0 or line[shown:]):
+            batcher.append(line[shown:])
+        shown = 0
+    
+    try:
+        # The incremental decoder keeps a UTF-8 character split across reads intact
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        pending = ""
+        while True:
+            chunk = await process.stdout.read(TOOL_OUTPUT_READ_SIZE)
+            if not chunk:
+                break
+            *lines, pending = (pending + decoder.decode(chunk)).split("\n")
+            for line in lines:
+                emit(line)
+            # Progress dots arrive without a newline, show them as they accumulate
+            if batcher and len(pending) - shown >= TOOL_OUTPUT_PARTIAL_LINE:
+                batcher.append(pending[shown:])
+                shown = len(pending)
+        pending += decoder.decode(b"", final=True)
+        if pending:
+            emit(pending)
+    finally:
+        if batcher:
+            batcher.close()
+    returncode = await process.wait()
     
     if log_output:
-        if result.stdout:
-            log_output.push(result.stdout)
-        if result.stderr:
-            log_output.push(f"ERROR: {result.stderr}")
-        log_output.push(f"\nProcess finished with return code {result.returncode}")
+        log_output.push(f"\nProcess finished with return code {returncode}")
         log_output.push("Done!")
     
     # Check for the output tracking file
     created_files = []
     if os.path.exists(tracking_file):
         try:
-            with open(tracking_file, 'r', encoding='utf-8') as f:
-                file_content = f.read()
-                
+            # Single pass over the listed paths; blank lines would resolve to the cwd
             with open(tracking_file, 'r', encoding='utf-8') as f:
                 for line in f:
                     file_path = line.strip()
+                    if not file_path:
+                        continue
                     abs_file_path = os.path.abspath(file_path)
                     
-                    if abs_file_path and os.path.exists(abs_file_path):
+                    if os.path.exists(abs_file_path):
                         if log_output:
                             log_output.push(f"DEBUG: Valid file found: {abs_file_path}")
                         created_files.append(abs_file_path)
-                    elif abs_file_path:
-                        if log_output:
-                            log_output.push(f"DEBUG: Listed file doesn't exist: {abs_file_path}")
+                    elif log_output:
+                        log_output.push(f"DEBUG: Listed file doesn't exist: {abs_file_path}")
         except Exception as e:
             if log_output:
                 log_output.push(f"Error reading output files list: {e}")
@@ -545,7 +794,7 @@ def run_tool(script_name, args_dict, log_output=None):
         if log_output:
             log_output.push(f"DEBUG ERROR: Tracking file not found after tool execution")
     
-    return result.stdout, result.stderr, created_files
+    return "\n".join(output_lines), "", created_files
 
 ###############################################################################
 # FUNCTION: Tool Options Retrieval
@@ -603,10 +852,95 @@ async def get_tool_options(script_name, log_output=None):
     
     return tool_config['options']
 
+def lookup_tool_options(script_name):
+    """
+    Return the cached options for a script if the JSON config is unchanged.
+    
+    Args:
+        script_name: The script filename
+        
+    Returns:
+        List of option dictionaries, or None if not cached
+    """
+    try:
+        key = (script_name, os.stat(TOOLS_JSON_PATH).st_mtime_ns)
+    except OSError:
+        return None
+    options = tool_options_cache.get(key)
+    if options is not None:
+        tool_options_cache.move_to_end(key)
+    return options
+
+async def get_cached_tool_options(script_name, log_output=None):
+    """
+    Get options for a script, only reading the JSON config when it has
+    changed since the last time this tool was selected.
+    
+    Args:
+        script_name: The script filename
+        log_output: Optional log component to display information
+        
+    Returns:
+        List of option dictionaries with name, arg_name, description, required, default, type
+    """
+    options = lookup_tool_options(script_name)
+    if options is not None:
+        return options
+    
+    try:
+        key = (script_name, os.stat(TOOLS_JSON_PATH).st_mtime_ns)
+    except OSError:
+        key = None
+    options = await get_tool_options(script_name, log_output)
+    if options and key is not None:
+        tool_options_cache[key] = options
+        while len(tool_options_cache) > TOOL_OPTIONS_CACHE_SIZE:
+            tool_options_cache.popitem(last=False)
+    return options
+
+def warm_tool_caches():
+    """
+    Fill the per-tool option caches for every tool in the config, so the
+    first click on a tool doesn't have to read and scan the JSON file.
+    Everything is built from the one config load here.
+    """
+    config, problem = ensure_and_load_tools_config()
+    if problem:
+        return
+    try:
+        mtime_ns = os.stat(TOOLS_JSON_PATH).st_mtime_ns
+    except OSError:
+        return
+    tool_names = [name for name in config if not name.startswith('_')]
+    for script_name in tool_names[-TOOL_OPTIONS_CACHE_SIZE:]:
+        options = config[script_name].get('options', [])
+        tool_options_cache[(script_name, mtime_ns)] = options
+        option_specs_cache[(script_name, mtime_ns)] = build_option_specs(options)
+
 ###############################################################################
 # FUNCTION: Options Dialog
 ###############################################################################
 
+# Number of option cards built between yields to the event loop
+OPTIONS_BUILD_BATCH = 16
+
+# Option names containing any of these are edited with the file picker ("dir" also covers "directory")
+FILE_OPTION_NAME_RE = re_engine.compile(r'file|path|dir')
+
+@lru_cache(maxsize=256)
+def option_kind(name, option_type):
+    """
+    Classify an option for the options dialog, once per (name, type).
+    
+    Returns:
+        One of "bool", "int", "float", "choices", "file" or "text"
+    """
+    if option_type in ("bool", "int", "float", "choices"):
+        return option_type
+    if option_type in ("file", "path") or FILE_OPTION_NAME_RE.search(name.lower()):
+        return "file"
+    return "text"
+
 async def browse_files_handler(input_element, start_path, option_name, option_type):
     """Global handler for file browsing that's not affected by loop closures"""
     try:
@@ -694,18 +1028,25 @@ async def build_options_dialog(script_name, options):
             grouped_options[group].append(option)
         
         # Create the options container with sections by group
+        options_built = 0
         with ui.column().classes('w-full gap-2'):
             # For each group, create a section
             for group_name, group_options in grouped_options.items():
                 with ui.expansion(group_name, value=True).classes('w-full q-mb-md'):
                     # For each option in this group, create an appropriate input field
                     for option in group_options:
+                        # Yield to the event loop now and then so tools with many options don't stall it
+                        options_built += 1
+                        if options_built % OPTIONS_BUILD_BATCH == 0:
+                            await asyncio.sleep(0)
+                        
                         name = option["name"]
                         description = option["description"]
                         required = option.get("required", False)
                         arg_name = option.get("arg_name", "")
                         default_value = option.get("default")
                         option_type = option.get("type", "str")  # Get the explicit type
+                        kind = option_kind(name, option_type)
                         choices = option.get("choices", None)
                         
                         # Format the label
@@ -725,12 +1066,12 @@ async def build_options_dialog(script_name, options):
                                 ui.label(f"Default: {default_value}").classes('text-caption text-grey-7')
                             
                             # Create appropriate input fields based on the explicit type
-                            if option_type == "bool":
+                            if kind == "bool":
                                 # Boolean options (checkboxes)
                                 value_to_use = default_value if default_value is not None else False
                                 checkbox = ui.checkbox("Enable this option", value=value_to_use)
                                 input_elements[name] = checkbox
-                            elif option_type == "int":
+                            elif kind == "int":
                                 # Integer input fields
                                 value_to_use = default_value if default_value is not None else None
                                 
@@ -750,7 +1091,7 @@ async def build_options_dialog(script_name, options):
                                         precision=0  # Force integer values only
                                     )
                                     input_elements[name] = input_field
-                            elif option_type == "float":
+                            elif kind == "float":
                                 # Float input fields
                                 value_to_use = default_value if default_value is not None else None
                                 
@@ -769,7 +1110,7 @@ async def build_options_dialog(script_name, options):
                                         value=value_to_use
                                     )
                                     input_elements[name] = input_field
-                            elif option_type == "choices":
+                            elif kind == "choices":
                                 # Dropdown for choices
                                 if choices:
                                     dropdown = ui.select(
@@ -785,7 +1126,7 @@ async def build_options_dialog(script_name, options):
                                         value=default_value
                                     )
                                     input_elements[name] = input_field
-                            elif option_type == "file" or option_type == "path" or any(kw in name.lower() for kw in ["file", "path", "dir", "directory"]):
+                            elif kind == "file":
                                 # File/directory paths with integrated file picker
                                 with ui.row().classes('w-full items-center'):
                                     input_field = ui.input(
@@ -807,19 +1148,12 @@ async def build_options_dialog(script_name, options):
                                         default_path = DEFAULT_SAVE_DIR
                                     
                                     # Default button sets the default path without opening file picker
+                                    # (partial binds this iteration's values, no per-option closure needed)
                                     ui.button("Default", icon='description').props('flat dense no-caps').on('click', 
-                                        lambda i=input_field, p=default_path: i.set_value(p))
+                                        partial(input_field.set_value, default_path))
 
-                                    # Store the needed variables for the current iteration in the closure
-                                    current_name = name
-                                    current_option_type = option_type
-                                    current_default_path = default_path
-                                    current_input = input_field  # Create a stable reference
-
-                                    # Define the button click handler to explicitly pass the captured references
                                     ui.button("Browse", icon='folder_open').props('flat dense no-caps').on('click', 
-                                        lambda e, input=current_input, path=current_default_path, n=current_name, t=current_option_type: 
-                                            browse_files_handler(input, path, n, t))
+                                        partial(browse_files_handler, input_field, default_path, name, option_type))
                             else:
                                 # Default to text input for all other types
                                 input_field = ui.input(
@@ -840,11 +1174,12 @@ async def build_options_dialog(script_name, options):
                     # Collect values from input elements
                     option_values = {}  # For running the tool
                     changed_options = {}  # For saving as preferences
+                    options_by_name = {opt['name']: opt for opt in options}
                     
                     for name, input_element in input_elements.items():
                         if hasattr(input_element, 'value'):
                             # Find the original option to get its default value and type
-                            original_option = next((opt for opt in options if opt['name'] == name), None)
+                            original_option = options_by_name.get(name)
                             if original_option is None:
                                 continue
                                 
@@ -884,6 +1219,27 @@ async def build_options_dialog(script_name, options):
     dialog.open()
     return await result_future
 
+def option_args(name, value, option_type, is_required):
+    """
+    Command-line arguments for one option value.
+    
+    Returns:
+        Tuple of () to skip the option, (name,) for a set bool flag,
+        or (name, value) for everything else
+    """
+    if option_type == "bool":
+        # Just add the flag for boolean options
+        return (name,) if value else ()
+    
+    # Convert values to correct type if needed
+    if option_type == "int" and isinstance(value, float):
+        value = int(value)
+    
+    # Include the parameter if it's not an empty string or if it's required
+    if isinstance(value, str) and value.strip() == "" and not is_required:
+        return ()
+    return (name, str(value))
+
 def build_command_string(script_name, option_values):
     """
     Build a command-line argument string from option values.
@@ -896,16 +1252,8 @@ def build_command_string(script_name, option_values):
     Returns:
         Tuple of (full command string, args_list) for display and execution
     """
-    # Load the tool configurations to check for required parameters - always force reload
-    config = load_tools_config(force_reload=True)
-    tool_config = config.get(script_name, {})
-    options = tool_config.get('options', [])
-
-    # Get all required option names
-    required_options = [opt['name'] for opt in options if opt.get('required', False)]
-    
-    # Create a mapping of option names to their types
-    option_types = {opt['name']: opt.get('type', 'str') for opt in options}
+    # Get the option types and required option names, re-read whenever the config changes
+    option_types, required_options = get_option_specs(script_name)
     
     # Check if all required options are provided
     missing_required = [opt for opt in required_options if opt not in option_values]
@@ -916,56 +1264,25 @@ def build_command_string(script_name, option_values):
             option_values[opt] = ""
     
     # Create a properly formatted argument list
-    args_list = []
-    
     # Simply include ALL parameters - don't check against defaults
-    for name, value in option_values.items():
-        # Get the option type
-        option_type = option_types.get(name, 'str')
-        
-        # Convert values to correct type if needed
-        if option_type == "int" and isinstance(value, float):
-            value = int(value)
-        
-        if option_type == "bool":
-            if value:
-                # Just add the flag for boolean options
-                args_list.append(name)
-        else:
-            # Handle empty strings
-            is_empty_string = isinstance(value, str) and value.strip() == ""
-            is_required = name in required_options
-            
-            # Include the parameter if it's not an empty string or if it's required
-            if not is_empty_string or is_required:
-                args_list.append(name)
-                args_list.append(str(value))
+    args_list = list(chain.from_iterable(
+        option_args(name, value, option_types.get(name, 'str'), name in required_options)
+        for name, value in option_values.items()
+    ))
     
     # Add default save_dir if not specified
-    # if not any(arg.startswith('--save_dir') for arg in args_list):
+    # if '--save_dir' not in option_values:
     #     args_list.extend(['--save_dir', DEFAULT_SAVE_DIR])
     
     # Determine the Python executable based on platform
     python_exe = 'python'  # Using python directly for all platforms
     
-    # Build the full command for display
-    # Use proper platform-specific quoting for display purposes
-    quoted_args = []
-    for arg in args_list:
-        if platform.system() == 'Windows':
-            # On Windows, quote if arg contains spaces
-            if ' ' in arg:
-                quoted_args.append(f'"{arg}"')
-            else:
-                quoted_args.append(arg)
-        else:
-            # On Unix, use shell-style quoting (simple version)
-            if ' ' in arg or any(c in arg for c in '*?[]{}():,&|;<>~`!$'):
-                quoted_args.append(f"'{arg}'")
-            else:
-                quoted_args.append(arg)
-    
-    full_command = f"{python_exe} -u {script_name} {' '.join(quoted_args)}"
+    # Build the full command for display, quoted the way the platform's shell expects
+    cmd = [python_exe, "-u", script_name] + args_list
+    if platform.system() == 'Windows':
+        full_command = subprocess.list2cmdline(cmd)
+    else:
+        full_command = shlex.join(cmd)
     
     return full_command, args_list
 
@@ -1165,7 +1482,8 @@ async def run_tool_ui(script_name, args_dict=None):
                     ).props('no-caps flat dense').classes('bg-red-600 text-white')
             
             # Output area using a terminal-like log component
-            log_output = ui.log().classes('w-full flex-grow') \
+            # Bounded so long-running tools can't grow the page without limit
+            log_output = ui.log(max_lines=TOOL_LOG_MAX_LINES).classes('w-full flex-grow') \
                 .style('min-height: 60vh; background-color: #0f1222; color: #b2f2bb; font-family: monospace; padding: 1rem; border-radius: 4px; margin: 1rem;')
             log_output.push("Tool output will appear here...")
 
@@ -1208,7 +1526,7 @@ async def run_tool_ui(script_name, args_dict=None):
                 
                 try:
                     # Run the tool and display output
-                    stdout, stderr, created_files = await run.io_bound(run_tool, script_name, args_dict, log_output)
+                    stdout, stderr, created_files = await run_tool(script_name, args_dict, log_output)
                     
                     # If files were created, update the file selection dropdown
                     if created_files:
@@ -1252,40 +1570,55 @@ async def run_tool_ui(script_name, args_dict=None):
     dialog.open()
 
 ###############################################################################
-# Check for JSON config file existence
+# Functions for managing preferences
 ###############################################################################
 
-def check_config_file():
+def file_digest(file_path, chunk_size=CONFIG_BUFFER_SIZE):
+    """Return the blake2b hex digest of a file, read in 1 MiB chunks."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def list_config_backups():
     """
-    Check if the JSON configuration file exists.
-    Display an error message if it doesn't.
+    List the backups of the configuration file, newest first.
     
     Returns:
-        Boolean indicating whether the configuration file exists
+        List of backup file paths
     """
-    if not os.path.exists(TOOLS_JSON_PATH):
-        ui.notify(f"Error: Configuration file not found at {TOOLS_JSON_PATH}. Please ensure it exists.", 
-                 type="negative", 
-                 timeout=0)  # Set timeout to 0 to make the notification persistent
-        return False
-    return True
+    config_dir = os.path.dirname(os.path.abspath(TOOLS_JSON_PATH))
+    backups = [
+        os.path.join(config_dir, name) for name in os.listdir(config_dir)
+        if CONFIG_BACKUP_NAME_RE.fullmatch(name)
+    ]
+    backups.sort(key=os.path.getmtime, reverse=True)
+    return backups
 
-###############################################################################
-# Functions for managing preferences
-###############################################################################
-
-def backup_config_file():
+async def backup_config_file():
     """
-    Create a backup of the configuration file.
+    Create a backup of the configuration file named by its content hash,
+    so an unchanged config is never copied twice. Only the newest
+    CONFIG_BACKUPS_TO_KEEP backups are kept.
+    The file work runs in a worker thread so the UI stays responsive.
     
     Returns:
         Boolean indicating success or failure
     """
     try:
         if os.path.exists(TOOLS_JSON_PATH):
-            backup_path = f"{TOOLS_JSON_PATH}.bak"
-            with open(TOOLS_JSON_PATH, 'r') as src, open(backup_path, 'w') as dst:
-                dst.write(src.read())
+            digest = await asyncio.to_thread(file_digest, TOOLS_JSON_PATH)
+            backup_path = f"{TOOLS_JSON_PATH}.{digest[:12]}.bak"
+            if os.path.exists(backup_path):
+                # mark it as the most recent backup so rotation keeps it
+                os.utime(backup_path)
+                ui.notify("Backup already up-to-date", type="info")
+                return True
+            await asyncio.to_thread(shutil.copyfile, TOOLS_JSON_PATH, backup_path)
+            for old_backup in list_config_backups()[CONFIG_BACKUPS_TO_KEEP:]:
+                os.remove(old_backup)
+            ui.notify(f"Configuration backed up to {backup_path}", type="positive")
             return True
         else:
             ui.notify(f"Cannot create backup - file does not exist", type="negative")
@@ -1293,27 +1626,61 @@ def backup_config_file():
         ui.notify(f"Error creating backup: {str(e)}", type="negative")
     return False
 
-def restore_config_from_backup():
+async def restore_config_from_backup(backup_path=None):
     """
     Restore the configuration file from a backup.
+    The copy runs in a worker thread so the UI stays responsive.
+    
+    Args:
+        backup_path: The backup to restore, defaults to the newest one
     
     Returns:
         Boolean indicating success or failure
     """
-    backup_path = f"{TOOLS_JSON_PATH}.bak"
-    if not os.path.exists(backup_path):
+    if backup_path is None:
+        backups = list_config_backups()
+        backup_path = backups[0] if backups else None
+    if not backup_path or not os.path.exists(backup_path):
         ui.notify(f"No backup file found", type="negative")
         return False
     
     try:
-        with open(backup_path, 'r') as src, open(TOOLS_JSON_PATH, 'w') as dst:
-            dst.write(src.read())
-        ui.notify(f"Configuration restored from backup", type="positive")
+        # copyfile (not copy2) so the restored config gets a fresh mtime
+        await asyncio.to_thread(shutil.copyfile, backup_path, TOOLS_JSON_PATH)
+        invalidate_tools_config_cache()
+        ui.notify(f"Configuration restored from {os.path.basename(backup_path)}", type="positive")
         return True
     except Exception as e:
         ui.notify(f"Error restoring from backup: {str(e)}", type="negative")
         return False
 
+async def select_config_backup_dialog():
+    """
+    Display a dialog listing the configuration backups, newest first.
+    
+    Returns:
+        The selected backup path or None if cancelled
+    """
+    backups = list_config_backups()
+    if not backups:
+        ui.notify(f"No backup file found", type="negative")
+        return None
+    
+    backup_options = {
+        path: f"{os.path.basename(path)}  ({time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(os.path.getmtime(path)))})"
+        for path in backups
+    }
+    
+    with ui.dialog() as dialog, ui.card().classes('w-full max-w-xl p-4'):
+        ui.label('Restore Configuration').classes('text-h6')
+        backup_select = ui.select(options=backup_options, value=backups[0], label='Backup').classes('w-full')
+        with ui.row().classes('w-full justify-end gap-2 mt-4'):
+            ui.button('Cancel', on_click=lambda: dialog.submit(None)).props('flat no-caps').classes('text-grey')
+            ui.button('Restore', on_click=lambda: dialog.submit(backup_select.value)) \
+                .props('color=primary no-caps').classes('text-white')
+    
+    return await dialog
+
 ###############################################################################
 # Project Management Functions
 ###############################################################################
@@ -1456,8 +1823,7 @@ async def select_project_dialog():
                 return
             
             # Ensure the name is valid for a directory
-            invalid_chars = r'[<>:"/\\|?*]'
-            if re.search(invalid_chars, new_project_name):
+            if INVALID_PROJECT_NAME_RE.search(new_project_name):
                 ui.notify("Project name contains invalid characters", type="negative")
                 return
             
@@ -1601,6 +1967,49 @@ async def show_config_dialog():
     
     dialog.open()
 
+###############################################################################
+# Tool Selection Helpers
+###############################################################################
+
+def get_tool_select_options(config):
+    """
+    Build the tool dropdown contents from a loaded configuration.
+    
+    Args:
+        config: Dictionary of tool configurations
+        
+    Returns:
+        Tuple of (dict mapping tool names to titles, dict mapping tool names to descriptions)
+    """
+    options_dict = {}
+    desc_by_name = {}
+    for tool_name, tool_data in (config or {}).items():
+        if not tool_name.startswith('_'):  # skip special configuration sections
+            options_dict[tool_name] = tool_data.get("title", tool_name)
+            desc_by_name[tool_name] = tool_data.get("description", "No description available")
+    return options_dict, desc_by_name
+
+def refresh_tool_select(selected_tool, tool_description, desc_by_name):
+    """
+    Repopulate the tool dropdown in place from the JSON config,
+    instead of reloading the whole page in the browser.
+    
+    Args:
+        selected_tool: The ui.select holding the tool names
+        tool_description: The ui.label showing the selected tool's description
+        desc_by_name: Dictionary of descriptions, updated in place
+    """
+    invalidate_tools_config_cache()
+    config = load_tools_config(force_reload=True)
+    options_dict, new_descriptions = get_tool_select_options(config)
+    desc_by_name.clear()
+    desc_by_name.update(new_descriptions)
+    
+    # keep the current selection if the tool still exists
+    value = selected_tool.value if selected_tool.value in options_dict else next(iter(options_dict), None)
+    selected_tool.set_options(options_dict, value=value)
+    tool_description.set_text(desc_by_name.get(value, '') if value else '')
+
 ###############################################################################
 # Main UI and Workflow
 ###############################################################################
@@ -1669,65 +2078,55 @@ async def main():
             ui.label('Select a tool to run:').classes('text-h6')
             
             # Load tool options from JSON file
-            config = load_tools_config()
-
-            tool_options = []
-
-            if config:
-                # Extract tool names and descriptions
-                for tool_name, tool_data in config.items():
-                    if not tool_name.startswith('_'):  # skip special configuration sections
-                        tool_options.append({
-                            "name": tool_name,
-                            "title": tool_data.get("title", tool_name),
-                            "description": tool_data.get("description", "No description available")
-                        })
+            config, problem = ensure_and_load_tools_config()
+
+            # Map tool names to their titles (dropdown) and descriptions
+            options_dict, desc_by_name = get_tool_select_options(config or {})
             
-            if not tool_options:
+            if problem:
+                ui.label(f"No tools found: {problem}").classes('text-negative')
+                default_tool_name = None
+            elif not options_dict:
                 ui.label("No tools found in configuration file. Please check the JSON file.").classes('text-negative')
-                default_tool_name = ""
-                default_description = ""
+                default_tool_name = None
             else:
-                default_tool_name = tool_options[0]["name"]
-                default_description = tool_options[0]["description"]
-
-            # Create a dictionary mapping tool names to their titles
-            options_dict = {tool["name"]: tool["title"] for tool in tool_options} if tool_options else {}
+                default_tool_name = next(iter(options_dict))
 
             selected_tool = ui.select(
                 options=options_dict,
                 label='Tool',
-                value=tool_options[0]["name"] if tool_options else None
+                value=default_tool_name
             ).classes('w-full')
 
-            # Display the description of the selected tool
-            tool_description = ui.label(default_description).classes('text-caption text-grey-7 mt-2')
-            
-            def update_description(e):
-                selected_value = selected_tool.value  # This is the tool name
-                if selected_value:
-                    for tool in tool_options:
-                        if tool['name'] == selected_value:  # Compare with name, not title
-                            tool_description.set_text(tool.get('description', ''))
-                            break
-                else:
-                    tool_description.set_text('')            
-
-            # Attach the update function to the select element's change event
-            selected_tool.on('update:model-value', update_description)
+            # Display the description of the selected tool, kept in sync by a binding
+            tool_description = ui.label().classes('text-caption text-grey-7 mt-2')
+            selected_tool.bind_value_to(tool_description, 'text', forward=lambda v: desc_by_name.get(v, '') if v else '')
             
             # Spacer to create vertical space where the status message used to be
             ui.space().classes('h-4')
             
                             # Action buttons row
             with ui.row().classes('w-full justify-center gap-4 mt-3'):
+                # Tools being set up on this page, a second click on one is ignored until its dialogs close
+                tools_in_setup = set()
+                
                 async def configure_and_run_tool():
-                    global CURRENT_PROJECT, CURRENT_PROJECT_PATH, DEFAULT_SAVE_DIR
                     script_name = selected_tool.value
                     if not script_name:
                         ui.notify('Please select a tool first', type='warning')
                         return
                     
+                    # A double click would otherwise load the options and open the dialogs twice
+                    if script_name in tools_in_setup:
+                        return
+                    tools_in_setup.add(script_name)
+                    try:
+                        await setup_and_run_tool(script_name)
+                    finally:
+                        tools_in_setup.discard(script_name)
+                
+                async def setup_and_run_tool(script_name):
+                    global CURRENT_PROJECT, CURRENT_PROJECT_PATH, DEFAULT_SAVE_DIR
                     # First check if we have a project selected
                     if not CURRENT_PROJECT or not CURRENT_PROJECT_PATH:
                         ui.notify('You must create or select a project before using tools', type='warning')
@@ -1749,23 +2148,29 @@ async def main():
                         ui.navigate.reload()
                         return
                     
-                    # Create a log dialog for displaying JSON information
-                    json_dialog = ui.dialog().props('maximized')
+                    # Reuse the options if the JSON file hasn't changed since the last selection
+                    options = lookup_tool_options(script_name)
                     
-                    with json_dialog, ui.card().classes('w-full'):
-                        with ui.column().classes('w-full p-4'):
-                            ui.label(f'Loading options for {script_name} from JSON').classes('text-h6')
-                            json_log = ui.log().classes('w-full') \
-                                .style('height: 300px; background-color: #0f1222; color: #b2f2bb; font-family: monospace; padding: 1rem; border-radius: 4px;')
-                            ui.button('Close', on_click=json_dialog.close).props('no-caps').classes('self-end')
-                    
-                    json_dialog.open()
-                    
-                    # Always get fresh options directly from the file - this is critical!
-                    options = await get_tool_options(script_name, json_log)
-                    
-                    # Close the JSON dialog
-                    json_dialog.close()
+                    if options is None:
+                        # Create a log dialog for displaying JSON information
+                        json_dialog = ui.dialog().props('maximized')
+                        
+                        with json_dialog, ui.card().classes('w-full'):
+                            with ui.column().classes('w-full p-4'):
+                                ui.label(f'Loading options for {script_name} from JSON').classes('text-h6')
+                                json_log = ui.log().classes('w-full') \
+                                    .style('height: 300px; background-color: #0f1222; color: #b2f2bb; font-family: monospace; padding: 1rem; border-radius: 4px;')
+                                ui.button('Close', on_click=json_dialog.close).props('no-caps').classes('self-end')
+                        
+                        json_dialog.open()
+                        # Let the dialog render before reading the file
+                        await asyncio.sleep(0)
+                        
+                        # Read the options from the file, any save changes its mtime - this is critical!
+                        options = await get_cached_tool_options(script_name, json_log)
+                        
+                        # Close the JSON dialog
+                        json_dialog.close()
                     
                     if not options:
                         ui.notify('Failed to load options from JSON. Check if the configuration exists.', type="negative")
@@ -1785,15 +2190,26 @@ async def main():
                         if should_run is None:
                             # User wants to edit options
                             # Reload options to get the latest values
-                            options = await get_tool_options(script_name)
+                            options = await get_cached_tool_options(script_name)
                             continue
                         elif should_run:
+                            # Setup is over, the tool may be set up again while this run goes on
+                            tools_in_setup.discard(script_name)
                             await run_tool_ui(script_name, option_values)
                             break
                         else:
                             # User cancelled - don't show any status message
                             break
                 
+                def reload_config():
+                    refresh_tool_select(selected_tool, tool_description, desc_by_name)
+                    ui.notify("Configuration reloaded", type="positive")
+                
+                async def restore_config():
+                    backup_path = await select_config_backup_dialog()
+                    if backup_path and await restore_config_from_backup(backup_path):
+                        refresh_tool_select(selected_tool, tool_description, desc_by_name)
+                
                 # Create a container for the button to apply the disabled state conditionally
                 with ui.element('div').classes('text-center'):
                     run_button = ui.button('Setup then Run', on_click=configure_and_run_tool) \
@@ -1804,19 +2220,32 @@ async def main():
                     if not CURRENT_PROJECT or not CURRENT_PROJECT_PATH:
                         run_button.props('disabled')
                         run_button.tooltip('Create or select a project first')
+                
+                with ui.row().classes('gap-1'):
+                    ui.button('Reload Config', on_click=reload_config) \
+                        .props('no-caps flat').classes('text-blue-600') \
+                        .tooltip(f'Re-read the tool list from {TOOLS_JSON_PATH}')
+                    ui.button('Backup Config', on_click=backup_config_file) \
+                        .props('no-caps flat').classes('text-blue-600') \
+                        .tooltip(f'Save a copy of {TOOLS_JSON_PATH}')
+                    ui.button('Restore Config', on_click=restore_config) \
+                        .props('no-caps flat').classes('text-orange-600') \
+                        .tooltip(f'Replace {TOOLS_JSON_PATH} with a backup')
 
 if __name__ == "__main__":
-    # Check for config file first
-    if not check_config_file():
-        print("Configuration file not found. Please ensure tools_config.json exists.")
+    # Check for and load the config file before starting the app to initialize settings
+    _, problem = ensure_and_load_tools_config()
+    if problem:
+        print(f"{problem}. Please ensure tools_config.json exists and is valid JSON.")
         sys.exit(1)
-
-    # Load configuration before starting the app to initialize settings
-    load_tools_config(force_reload=True)
     
     # Make sure the projects directory exists
     os.makedirs(PROJECTS_DIR, exist_ok=True)
     
+    # Prime the tool option caches once the server is up; this runs on the
+    # event loop, which owns those caches (the work is a single config load)
+    app.on_startup(warm_tool_caches)
+    
     ui.run(
         host=HOST,
         port=PORT,